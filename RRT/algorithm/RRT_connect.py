@@ -5,7 +5,7 @@ from RRT.algorithm.RRT_template import RRT_Template
 from RRT.core.info import DroneInfo
 from RRT.core.mission_info import MissionInfo
 from RRT.core.route_info import RouteInfo
-from RRT.core.sign import AlgStatus, Status
+from RRT.core.sign import AlgStatus
 from RRT.core.tree import Tree, TreeNode
 from RRT.util.distcalc import dist_calc
 from RRT.util.path_cat import cat_path
@@ -13,7 +13,11 @@ from RRT.util.samplemethod import steer
 
 
 class RRT_Connect(RRT_Template):
-    """basic Rapidly-exploring Random Tree algorithm with only one forward-search tree"""
+    """basic Rapidly-exploring Random Tree algorithm with only one forward-search tree
+
+    The lazy mode of RRT_Template rarely pays off here: the greedy connection towards a sample is checked step by
+    step anyway, and once it is cut by a wall it is grown and checked again, so about as many edges are checked.
+    """
 
     def __init__(
         self,
@@ -22,6 +26,7 @@ class RRT_Connect(RRT_Template):
         explore_prob: np.float64,
         step_size: np.float64,
         max_attempts: np.int32 = np.inf,
+        **kwargs,
     ):
         """the init method of RRT
 
@@ -35,66 +40,47 @@ class RRT_Connect(RRT_Template):
             the size/length of each step
         max_attempts : np.int32, optional
             the maximum number of attempts, by default np.inf
+        kwargs
+            the other settings passed to RRT_Template, e.g. seed
         """
         super().__init__(
-            drone_info, mission_info, explore_prob, step_size, max_attempts
+            drone_info, mission_info, explore_prob, step_size, max_attempts, **kwargs
         )
         self.forward_tree: Tree = Tree(mission_info.origin)
         self.backward_tree: Tree = Tree(mission_info.target)
         self.trees = [self.forward_tree, self.backward_tree]
 
-    def run(self) -> bool:
-        """the method to run the basic RRT algorithm
-
-        Returns
-        -------
-        bool
-            whether basic RRT algorithm reach the target from origin
-        """
-        attempt_cnt = 0
-        while True:
-            # loop ctrl condition
-            if np.isfinite(self.max_attempts) and attempt_cnt > self.max_attempts:
-                break
-            elif np.isinf(self.max_attempts) and self.final_ret is not None:
-                break
-
-            # loop start
-            attempt_cnt += 1
-
-            new_sample = self.sample(self.trees[-1].nodes[0].coord)
-            neighbors, neighbor_dist = self.trees[0].get_nearest_neighbors(new_sample)
-            new_sample = steer(neighbors[np.argmin(neighbor_dist)].coord, new_sample, self.step_size)
-
-            sample_node = TreeNode(new_sample)
-            if (
-                self.extend(self.trees[0], sample_node, neighbors[0])
-                != AlgStatus.Trapped
-            ):
-                flag = self.connect(self.trees[1], sample_node)
-                if flag == AlgStatus.Reached:
-                    ret = cat_path(
-                        self.forward_tree.get_route(
-                            self.forward_tree.get_node(sample_node)
-                        ),
-                        self.backward_tree.get_route(
-                            self.backward_tree.get_node(sample_node)
-                        ),
-                    )
-                    if self.final_ret is None:
-                        self.final_ret = ret
-                    elif ret.get_length() < self.final_ret.get_length():
-                        self.final_ret = ret
-
-            self.swap_tree()
-
-        if self.final_ret is not None:
-            return Status.Success
-        return Status.Failure
+    def iterate(self):
+        """the method to run one attempt of the algorithm"""
+        new_sample = self.sample(self.trees[-1].nodes[0].coord)
+        neighbors, neighbor_dist = self.trees[0].get_nearest_neighbors(new_sample)
+        new_sample = steer(neighbors[np.argmin(neighbor_dist)].coord, new_sample, self.step_size)
+
+        sample_node = TreeNode(new_sample)
+        if (
+            self.extend(self.trees[0], sample_node, neighbors[0])
+            != AlgStatus.Trapped
+        ):
+            flag = self.connect(self.trees[1], sample_node)
+            if flag == AlgStatus.Reached and self.validate_connection(sample_node):
+                ret = cat_path(
+                    self.forward_tree.get_route(
+                        self.forward_tree.get_node(sample_node)
+                    ),
+                    self.backward_tree.get_route(
+                        self.backward_tree.get_node(sample_node)
+                    ),
+                )
+                if self.final_ret is None:
+                    self.final_ret = ret
+                elif ret.get_length() < self.final_ret.get_length():
+                    self.final_ret = ret
+
+        self.swap_tree()
 
     def extend(self, tree: Tree, sample_node, neighbor_node):
-        if self.map_info.collision_free(RouteInfo([neighbor_node]).append(sample_node)):
-            tree.add_node(sample_node.coord, neighbor_node)
+        if self.edge_free(neighbor_node.coord, sample_node.coord):
+            tree.add_node(sample_node.coord, neighbor_node, not self.lazy)
             return AlgStatus.Advanced
         return AlgStatus.Trapped
 
@@ -123,6 +109,20 @@ class RRT_Connect(RRT_Template):
         """
         return self.final_ret
 
+    def validate_connection(self, sample_node) -> bool:
+        """the method to check the routes from the roots of both trees to the node connecting them
+
+        Returns
+        -------
+        bool
+            whether both routes are collision-free, see RRT_Template.validate_route
+        """
+        return self.validate_route(
+            self.forward_tree, self.forward_tree.find(sample_node.coord)
+        ) and self.validate_route(
+            self.backward_tree, self.backward_tree.find(sample_node.coord)
+        )
+
     def swap_tree(self):
         self.trees.reverse()
 
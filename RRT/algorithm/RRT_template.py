@@ -1,13 +1,28 @@
-import random
+import time
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Iterator, List, NamedTuple, Union
 
 import numpy as np
 from RRT.core.info import DroneInfo
 from RRT.core.map_space import MapSpace
 from RRT.core.mission_info import MissionInfo
 from RRT.core.route_info import RouteInfo
-from RRT.util.samplemethod import random_sample
+from RRT.core.sign import Status
+from RRT.core.tree import Tree
+from RRT.util.samplemethod import FreeSpaceSampler, InformedSampler, Sampler
+
+
+class Progress(NamedTuple):
+    """the progress of a planner, given by RRT_Template.step"""
+
+    # the number of attempts run so far
+    attempts: int
+    # the number of nodes in all the search trees
+    tree_size: int
+    # the length of the best route found so far, np.inf if there is none
+    best_cost: float
+    # whether the search has stopped, see RRT_Template.stop_reason
+    done: bool
 
 
 class RRT_Template(ABC):
@@ -18,6 +33,12 @@ class RRT_Template(ABC):
         explore_prob: np.float64,
         step_size: np.float64,
         max_attempts: np.int32 = np.inf,
+        seed: Union[int, np.random.Generator] = None,
+        sample_mode: str = "box",
+        time_budget: float = np.inf,
+        node_budget: int = np.inf,
+        collision_budget: int = np.inf,
+        lazy: bool = False,
     ):
         """the init method of RRT
 
@@ -33,6 +54,30 @@ class RRT_Template(ABC):
             the size/length of each step
         max_attempts : np.int32, optional
             the maximum number of attempts, by default np.inf
+        seed : Union[int, np.random.Generator], optional
+            the seed of the sampler, by default None (unpredictable)
+        sample_mode : str, optional
+            where the samples are drawn. Only to "box" (the integer points in the borders of the map) or "free" (the
+            cells that are not wall, jittered inside the cells unless the sample level of the map is "discrete"), by
+            default 'box'
+        time_budget : float, optional
+            the maximum wall-clock seconds of the search, counted from its first attempt, by default np.inf
+        node_budget : int, optional
+            the maximum number of nodes in all the search trees, by default np.inf
+        collision_budget : int, optional
+            the maximum number of segments checked against the walls of the map (the cache hits excluded), by default
+            np.inf
+        lazy : bool, optional
+            whether to add the edges to the trees unchecked and check only the edges of the routes reaching the
+            target (lazy collision checking), by default False. It saves the most in RRT_Star and Connect_RRT_Star,
+            which otherwise check the edges to all their neighbors, and little or nothing in RRT_Connect, whose
+            greedy connections are mostly cut and grown again. The wall-clock time only drops when a collision check
+            costs more than the extra attempts spent regrowing the cut subtrees
+
+        Raises
+        ------
+        ValueError
+            The variable [sample_mode] is invalid.
         """
         self.drone_info: DroneInfo = drone_info
         self.mission_info: MissionInfo = mission_info
@@ -40,25 +85,238 @@ class RRT_Template(ABC):
         self.explore_prob: np.float64 = explore_prob
         self.max_attempts: Union[np.int32, None] = max_attempts
         self.step_size: np.float64 = step_size
+        self.sample_mode: str = sample_mode
+        if sample_mode == "box":
+            self.sampler: Sampler = Sampler(
+                self.map_info.min_border, self.map_info.max_border, seed=seed
+            )
+        elif sample_mode == "free":
+            self.sampler: Sampler = FreeSpaceSampler(
+                self.map_info.free_cells(),
+                self.map_info.shape,
+                use_integer=self.map_info.sample_level == "discrete",
+                seed=seed,
+            )
+        else:
+            raise ValueError(
+                "The variable [sample_mode] must be invalid. Please check this variable!"
+            )
+
+        # the sampler for the planners refining the route, used once a route is found if set
+        self.informed_sampler: InformedSampler = None
+
+        self.time_budget: float = time_budget
+        self.node_budget: int = node_budget
+        self.collision_budget: int = collision_budget
+        self.lazy: bool = lazy
+        # the search trees, whose nodes are counted against the node budget
+        self.trees: List[Tree] = []
+
+        self.attempt_cnt: int = 0
+        # why the latest run stopped, one of "attempts", "solved", "time", "nodes" and "collisions"
+        self.stop_reason: str = None
+        self._deadline: float = None
+        self._collision_limit: float = None
 
         self.final_ret: RouteInfo = None
 
-    @abstractmethod
     def run(self) -> bool:
-        """the method to run the basic RRT algorithm
+        """the method to run the algorithm until the attempts or a budget runs out, or until the first route is found
+        when the attempts are unlimited
+
+        A search stopped by a budget is still a success if a route has been found, the best one so far is kept in
+        final_ret.
 
         Returns
         -------
         bool
-            whether basic RRT algorithm reach the target from origin
+            whether the algorithm reach the target from origin
         """
+        self.step(np.inf)
+
+        return self.status()
+
+    def step(self, num: int = 1) -> Progress:
+        """the method to run at most num attempts of the algorithm, fewer if the search stops before
+
+        The search can be resumed by later calls, so that many planners may be interleaved in one process, and it can
+        be given up whenever the route is good enough.
+
+        Parameters
+        ----------
+        num : int, optional
+            the maximum number of attempts, by default 1
+
+        Returns
+        -------
+        Progress
+            the progress after the attempts
+        """
+        cnt = 0
+        while cnt < num and not self.exhausted():
+            self.attempt_cnt += 1
+            self.iterate()
+            cnt += 1
+
+        return self.progress()
+
+    def steps(self, num: int = 1) -> Iterator[Progress]:
+        """the generator to run the algorithm num attempts at a time, until the search stops
+
+        Parameters
+        ----------
+        num : int, optional
+            the number of attempts between two yields, by default 1
+
+        Yields
+        ------
+        Progress
+            the progress after each num attempts, the last one is done
+        """
+        while True:
+            progress = self.step(num)
+            yield progress
+            if progress.done:
+                return
+
+    def progress(self) -> Progress:
+        """the method to get the progress of the search
+
+        Returns
+        -------
+        Progress
+            the progress so far
+        """
+        return Progress(
+            self.attempt_cnt,
+            self.tree_size(),
+            np.inf if self.final_ret is None else self.final_ret.get_length(),
+            self.exhausted(),
+        )
+
+    def status(self) -> Status:
+        """the method to get whether the algorithm has reached the target from origin so far
+
+        Returns
+        -------
+        Status
+            Success if a route is found, Failure otherwise
+        """
+        if self.final_ret is not None:
+            return Status.Success
+        return Status.Failure
+
+    @abstractmethod
+    def iterate(self):
+        """the method to run one attempt of the algorithm, which updates final_ret once it reaches the target"""
         pass
 
+    def exhausted(self) -> bool:
+        """the method to determine whether the search should stop, which also sets stop_reason
+
+        The budgets are measured from the first call, with the monotonic clock and the collision counter of the map.
+
+        Returns
+        -------
+        bool
+            whether the search should stop
+        """
+        if self._deadline is None:
+            self._deadline = time.monotonic() + self.time_budget
+            self._collision_limit = self.map_info.collision_checks + self.collision_budget
+
+        if np.isfinite(self.max_attempts) and self.attempt_cnt > self.max_attempts:
+            self.stop_reason = "attempts"
+        elif np.isinf(self.max_attempts) and self.final_ret is not None:
+            self.stop_reason = "solved"
+        elif time.monotonic() >= self._deadline:
+            self.stop_reason = "time"
+        elif self.tree_size() >= self.node_budget:
+            self.stop_reason = "nodes"
+        elif self.map_info.collision_checks >= self._collision_limit:
+            self.stop_reason = "collisions"
+        else:
+            return False
+        return True
+
+    def edge_free(self, start, end) -> bool:
+        """the method to check a new edge before it is added to a tree
+
+        In lazy mode only the end is checked, the edge itself is checked by validate_route once it is on a route to
+        the target.
+
+        Returns
+        -------
+        bool
+            whether the edge may be added
+        """
+        if self.lazy:
+            return self.map_info.polyline_free(np.array([end], dtype=np.float64))
+        return self.map_info.segment_free(start, end)
+
+    def edges_free(self, starts, end):
+        """the method to check the new edges from many starts to one end, as edge_free
+
+        Returns
+        -------
+        NDArray[Any]
+            whether each edge may be added
+        """
+        starts = np.asarray(starts, dtype=np.float64)
+        if self.lazy:
+            return np.full(starts.shape[0], self.edge_free(None, end))
+        return self.map_info.segments_free(starts, np.broadcast_to(end, starts.shape))
+
+    def validate_route(self, tree: Tree, idx: int) -> bool:
+        """the method to check the unchecked edges on the route from the root of a tree to a node
+
+        The edges are checked from the root on. The first one in collision is removed with the subtree under it, which
+        holds the node itself.
+
+        Parameters
+        ----------
+        tree : Tree
+            the search tree
+        idx : int
+            the index of the node
+
+        Returns
+        -------
+        bool
+            whether the whole route is collision-free, False if the node is not in the tree
+        """
+        if idx < 0:
+            return False
+
+        route = []
+        while idx > 0:
+            if not tree.checked[idx]:
+                route.append(idx)
+            idx = tree.parents[idx]
+
+        for idx in reversed(route):
+            if not self.map_info.segment_free(tree.coords[tree.parents[idx]], tree.coords[idx]):
+                tree.remove_subtree(idx)
+                return False
+            tree.checked[idx] = True
+        return True
+
+    def tree_size(self) -> int:
+        """the method to get the number of nodes in all the search trees
+
+        Returns
+        -------
+        int
+            the number of nodes
+        """
+        return sum(len(tree) for tree in self.trees)
+
     def sample(self, target=None):
-        if random.random() < self.explore_prob:
-            new_sample = random_sample(
-                self.map_info.min_border, self.map_info.max_border
-            )
+        if self.sampler.decide(self.explore_prob):
+            if self.informed_sampler is not None and self.final_ret is not None:
+                new_sample = self.informed_sampler.sample(self.final_ret.get_length())
+            else:
+                new_sample = self.sampler.sample()
         else:
             new_sample = self.mission_info.target if target is None else target
 
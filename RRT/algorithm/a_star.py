@@ -1,105 +1,232 @@
 from __future__ import annotations
 
+import heapq
+import itertools
+import time
+from typing import TYPE_CHECKING, Any, List, Tuple
+
 import numpy as np
 from RRT.core.info import DroneInfo
 from RRT.core.mission_info import MissionInfo
 from RRT.core.route_info import RouteInfo
 from RRT.core.sign import Status
-from RRT.core.tree import TreeNode
-from RRT.util.distcalc import dist_calc
+
+if TYPE_CHECKING:
+    from nptyping import NDArray
+
+
+def neighbor_offsets(ndim: int) -> Tuple[NDArray[(Any, Any)], NDArray[Any]]:
+    """the method to generate the moves to all the 3^ndim - 1 neighboring cells
+
+    Parameters
+    ----------
+    ndim : int
+        the number of dimension
+
+    Returns
+    -------
+    Tuple[NDArray[(Any, Any)], NDArray[Any]]
+        the (3^ndim - 1, ndim) offsets of the neighbors and the euclidean length of each move
+    """
+    offsets = np.array(list(itertools.product((-1, 0, 1), repeat=ndim)))
+    offsets = offsets[np.any(offsets != 0, axis=1)]
+
+    return offsets, np.sqrt(np.count_nonzero(offsets, axis=1))
+
+
+def octile_distance(
+    coords: NDArray[(Any, ...)], target: NDArray[Any]
+) -> NDArray[(Any, ...)]:
+    """the method to calculate the length of the shortest move sequence to the target on the empty grid
+
+    Moving along k dimensions at once costs sqrt(k), so with the offsets to the target sorted as d_1 >= ... >= d_n,
+    the distance is the sum of (d_k - d_{k+1}) * sqrt(k). It never overestimates the cost on a grid with walls and it
+    is consistent, so it is the heuristic of A_Star.
+
+    Parameters
+    ----------
+    coords : NDArray[(Any, ...)]
+        the coordinations of the cells, with the last axis as the dimension
+    target : NDArray[Any]
+        the coordination of the target
+
+    Returns
+    -------
+    NDArray[(Any, ...)]
+        the distance of each cell, with the shape of coords except the last axis
+    """
+    delta = -np.sort(-np.abs(np.asarray(coords) - target), axis=-1)
+    ndim = delta.shape[-1]
+    delta = np.concatenate((delta, np.zeros_like(delta[..., :1])), axis=-1)
+
+    return np.sum((delta[..., :-1] - delta[..., 1:]) * np.sqrt(np.arange(1, ndim + 1)), axis=-1)
+
+
+def _cell_octile_distance(
+    idx: int, strides: List[int], target: List[int], weights: List[float]
+) -> float:
+    """the method to calculate octile_distance for one cell given by its flat index, in plain python for the search
+
+    Parameters
+    ----------
+    idx : int
+        the flat index of the cell
+    strides : List[int]
+        the flat index stride of each dimension
+    target : List[int]
+        the coordination of the target
+    weights : List[float]
+        sqrt(k) for k = 1 ... ndim
+
+    Returns
+    -------
+    float
+        the distance
+    """
+    delta = []
+    for stride, target_coord in zip(strides, target):
+        coord, idx = divmod(idx, stride)
+        delta.append(abs(coord - target_coord))
+    delta.sort(reverse=True)
+    delta.append(0)
+
+    return sum((delta[k] - delta[k + 1]) * weight for k, weight in enumerate(weights))
+
 
 class A_Star:
+    """A* search on the grid of the map
+
+    The cells are the nodes and each cell links to its 3^ndim - 1 neighbors, with the euclidean distance between
+    their centers as the cost. A move is allowed whenever the neighbor is not wall.
+    """
+
     def __init__(
         self,
         drone_info: DroneInfo,
         mission_info: MissionInfo,
-        *args, **kwargs
+        *args,
+        time_budget: float = np.inf,
+        **kwargs
     ):
+        """the initial method for A_Star
+
+        Parameters
+        ----------
+        drone_info : DroneInfo
+            the drone infomation
+        mission_info : MissionInfo
+            the mission infomation
+        time_budget : float, optional
+            the maximum wall-clock seconds of each run, after which the search fails, by default np.inf
+        """
         self.drone_info = drone_info
         self.mission_info = mission_info
-        pass
+        self.time_budget: float = time_budget
+        self.final_ret: RouteInfo = None
+        # the number of cells expanded by the latest run
+        self.expanded: int = 0
+        # why the latest run stopped, "solved", "unreachable" or "time"
+        self.stop_reason: str = None
+
+    def _out_of_time(self, deadline: float) -> bool:
+        """the method to check the deadline, reading the clock only once every 1024 expansions
+
+        Parameters
+        ----------
+        deadline : float
+            the monotonic time the search must stop at
+
+        Returns
+        -------
+        bool
+            whether the search is out of time
+        """
+        if self.expanded & 1023 or time.monotonic() < deadline:
+            return False
+        self.stop_reason = "time"
+        return True
 
     def run(self) -> bool:
-        origin = self.mission_info.extract_origin_info()
-        origin_node = TreeNode(origin)
-        origin_node.real_dist = 0
+        """the method to run the A* algorithm
 
+        Returns
+        -------
+        bool
+            whether A* algorithm reach the target from origin
+        """
+        map_info = self.mission_info.map_info
+        origin = self.mission_info.extract_origin_info()
         target = self.mission_info.extract_target_info()
-        target_node = TreeNode(target)
 
-        map_info = self.mission_info.map_info
-        if map_info.map.ndim == 2:
-            change_dir = [
-                np.array([-1, 0]),
-                np.array([1, 0]),
-                np.array([0, 1]),
-                np.array([0, -1]),
-                np.array([-1, -1]),
-                np.array([-1, 1]),
-                np.array([1, -1]),
-                np.array([1, 1]),
-            ]
-        elif map_info.map.ndim == 3:
-                change_dir = [
-                    np.array([-1, 0, 0]),
-                    np.array([1, 0, 0]),
-                    np.array([0, 1, 0]),
-                    np.array([0, -1, 0]),
-                    np.array([0, 0, 1]),
-                    np.array([0, 0, -1]),
-                    np.array([0, -1, -1]),
-                    np.array([-1, 0, -1]),
-                    np.array([-1, -1, 0]),
-                    np.array([0, 1, 1]),
-                    np.array([1, 0, 1]),
-                    np.array([1, 1, 0]),
-                    np.array([0, -1, 1]),
-                    np.array([-1, 0, 1]),
-                    np.array([-1, 1, 0]),
-                    np.array([0, 1, -1]),
-                    np.array([1, 0, -1]),
-                    np.array([1, -1, 0]),
-                    np.array([-1, 1, 1]),
-                    np.array([1, -1, 1]),
-                    np.array([1, 1, -1]),
-                    np.array([1, -1, -1]),
-                    np.array([-1, 1, -1]),
-                    np.array([-1, -1, 1]),
-                    np.array([1, 1, 1]),
-                    np.array([-1, -1, -1]),
-                ]
+        # the map padded with a wall border, so the moves never leave it and need no bounds check
+        free = np.pad(~map_info.wall_mask(), 1, constant_values=False)
+        shape = free.shape
+        strides = np.cumprod((1,) + shape[:0:-1])[::-1]
+
+        offsets, move_costs = neighbor_offsets(map_info.ndim)
+        moves: List[Tuple[int, float]] = list(
+            zip((offsets @ strides).tolist(), move_costs.tolist())
+        )
+        origin_idx = int(np.dot(origin + 1, strides))
+        target_idx = int(np.dot(target + 1, strides))
+
+        # the heuristic is only calculated for the cells pushed, and the state of the cells is kept in flat arrays
+        heuristic_args = (
+            strides.tolist(),
+            (target + 1).tolist(),
+            np.sqrt(np.arange(1, map_info.ndim + 1)).tolist(),
+        )
+        free = free.ravel().tobytes()
+        closed = bytearray(len(free))
+        costs = np.full(len(free), np.inf)
+        parents = np.full(len(free), -1, dtype=np.intp)
+
+        # the open list holds (estimated total cost, insertion order, cell), the outdated entries are skipped
+        costs[origin_idx] = 0.0
+        open_list = [(_cell_octile_distance(origin_idx, *heuristic_args), 0, origin_idx)]
+        counter = 1
+        self.expanded = 0
+        deadline = time.monotonic() + self.time_budget
+        while open_list:
+            _, _, idx = heapq.heappop(open_list)
+            if closed[idx]:
+                continue
+            closed[idx] = 1
+            self.expanded += 1
+            if idx == target_idx:
+                break
+            if self._out_of_time(deadline):
+                return Status.Failure
+
+            cost = costs[idx]
+            for offset, move_cost in moves:
+                neighbor = idx + offset
+                if not free[neighbor] or closed[neighbor]:
+                    continue
+                new_cost = cost + move_cost
+                if new_cost < costs[neighbor]:
+                    costs[neighbor] = new_cost
+                    parents[neighbor] = idx
+                    heapq.heappush(
+                        open_list,
+                        (
+                            new_cost + _cell_octile_distance(neighbor, *heuristic_args),
+                            counter,
+                            neighbor,
+                        ),
+                    )
+                    counter += 1
         else:
+            self.stop_reason = "unreachable"
             return Status.Failure
 
-        used_coord = [tuple(origin)]
-        candidates = [origin_node]
-        currNode = candidates.pop()
-        while currNode != target_node:
-            for dir in change_dir:
-                new_coord = currNode.coord + dir
-                if any(new_coord < 0) == True:
-                    continue
-                if any(new_coord >= np.array(map_info.map.shape)) == True:
-                    continue
-                if not map_info.check_point_feasible(np.array([new_coord]), node_num=1, ndim=map_info.map.ndim):
-                    continue
-                if tuple(new_coord) in used_coord:
-                    continue
-                used_coord.append(tuple(new_coord))
-                real_dist = currNode.real_dist + 1
-                estimate_dist = dist_calc(new_coord, target)
-                new_node = TreeNode(new_coord, real_dist + estimate_dist, currNode)
-                new_node.real_dist = real_dist
-                candidates.append(new_node)
-            candidates.sort(key=lambda x: x.cost, reverse=True)
-            currNode = candidates.pop()
-
-        nodes = [currNode]
-        length = currNode.cost
-        while currNode.parent is not None:
-            currNode = currNode.parent
-            nodes.insert(0, currNode)
-        self.final_ret = RouteInfo(nodes, length)
+        self.stop_reason = "solved"
+        route = [target_idx]
+        while parents[route[-1]] >= 0:
+            route.append(int(parents[route[-1]]))
+        route.reverse()
+        coords = np.array(np.unravel_index(route, shape)).T - 1
+        self.final_ret = RouteInfo.from_coords(coords, float(costs[target_idx]))
 
         return Status.Success
 
@@ -5,8 +5,7 @@ from RRT.algorithm.RRT_template import RRT_Template
 from RRT.core.info import DroneInfo
 from RRT.core.mission_info import MissionInfo
 from RRT.core.route_info import RouteInfo
-from RRT.core.sign import Status
-from RRT.core.tree import Tree, TreeNode
+from RRT.core.tree import Tree
 from RRT.util.distcalc import dist_calc
 from RRT.util.samplemethod import steer
 
@@ -20,6 +19,7 @@ class BasicRRT(RRT_Template):
         mission_info: MissionInfo,
         step_size: np.float64,
         max_attempts: np.int32 = np.inf,
+        **kwargs,
     ):
         """the init method of RRT
 
@@ -33,51 +33,33 @@ class BasicRRT(RRT_Template):
             the size/length of each step
         max_attempts : np.int32, optional
             the maximum number of attempts, by default np.inf
+        kwargs
+            the other settings passed to RRT_Template, e.g. seed
         """
-        super().__init__(drone_info, mission_info, 1, step_size, max_attempts)
+        super().__init__(
+            drone_info, mission_info, 1, step_size, max_attempts, **kwargs
+        )
         self.search_tree: Tree = Tree(mission_info.origin)
-
-    def run(self) -> bool:
-        """the method to run the basic RRT algorithm
-
-        Returns
-        -------
-        bool
-            whether basic RRT algorithm reach the target from origin
-        """
-        attempt_cnt = 0
-        while True:
-            # loop ctrl condition
-            if np.isfinite(self.max_attempts) and attempt_cnt > self.max_attempts:
-                break
-            elif np.isinf(self.max_attempts) and self.final_ret is not None:
-                break
-
-            # loop start
-            attempt_cnt += 1
-
-            new_sample = self.sample()
-            neighbors, neighbor_dist = self.search_tree.get_nearest_neighbors(new_sample)
-            new_sample = steer(neighbors[np.argmin(neighbor_dist)].coord, new_sample, self.step_size)
-
-            if self.map_info.collision_free(
-                RouteInfo([neighbors[0]]).append(TreeNode(new_sample))
-            ):
-                new_node = self.search_tree.add_node(new_sample, neighbors[0])
-
-                if dist_calc(new_sample, self.mission_info.target) > self.step_size:
-                    continue
-                if not self.map_info.collision_free(
-                    RouteInfo([new_node]).append(TreeNode(self.mission_info.target))
-                ):
-                    continue
-
-                target_node = self.search_tree.add_node(self.mission_info.target, new_node)
-                self.final_ret = self.search_tree.get_route(target_node)
-
-        if self.final_ret is not None:
-            return Status.Success
-        return Status.Failure
+        self.trees = [self.search_tree]
+
+    def iterate(self):
+        """the method to run one attempt of the algorithm"""
+        new_sample = self.sample()
+        neighbors, neighbor_dist = self.search_tree.get_nearest_neighbors(new_sample)
+        new_sample = steer(neighbors[np.argmin(neighbor_dist)].coord, new_sample, self.step_size)
+
+        if self.edge_free(neighbors[0].coord, new_sample):
+            new_node = self.search_tree.add_node(new_sample, neighbors[0], not self.lazy)
+
+            if dist_calc(new_sample, self.mission_info.target) > self.step_size:
+                return
+            if not self.edge_free(new_node.coord, self.mission_info.target):
+                return
+
+            target_node = self.search_tree.add_node(self.mission_info.target, new_node, not self.lazy)
+            if not self.validate_route(self.search_tree, target_node.index):
+                return
+            self.final_ret = self.search_tree.get_route(target_node)
 
     def get_route(self) -> RouteInfo:
         """the instance method to get route info
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import cpu_count
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Tuple, Type
+
+import numpy as np
+from RRT.core.map_space import MapSpace
+from RRT.core.mission_info import MissionInfo
+from RRT.core.sign import Status
+
+if TYPE_CHECKING:
+    from nptyping import NDArray
+
+
+# the state of a worker process, set once by the initializer of the pool
+_map_info: MapSpace = None
+_planner: Tuple[type, tuple, dict] = None
+
+
+def _init_worker(
+    map_file: str,
+    map_kwargs: dict,
+    planner_cls: type,
+    args: tuple,
+    kwargs: dict,
+):
+    global _map_info, _planner
+    # the read-only memory map shares the pages of the file with the other workers
+    grid = np.load(map_file, mmap_mode="r")
+    _map_info = MapSpace(grid, **map_kwargs)
+    _planner = (planner_cls, args, kwargs)
+
+
+def _plan_mission(mission: Dict[str, Any]) -> Dict[str, Any]:
+    """the method to plan one mission on the map of the worker process
+
+    Parameters
+    ----------
+    mission : Dict[str, Any]
+        the mission with its "origin" and "target" coordinations, and optionally its "id" and "seed"
+
+    Returns
+    -------
+    Dict[str, Any]
+        the result with the "id", the "status" ("Success", "Failure" or "Error"), the "length" and the "route" (None
+        unless a route is found), the "stop_reason" of the planner and the "time" in seconds
+    """
+    start = time.perf_counter()
+    planner_cls, args, kwargs = _planner
+    ret = {"id": mission.get("id"), "status": "Error", "length": None, "route": None}
+    try:
+        # a mission starting or ending in a wall would search until its budget runs out
+        for name in ("origin", "target"):
+            if not _map_info.polyline_free(np.array([mission[name]], dtype=np.float64)):
+                raise ValueError(
+                    f"The variable [{name}] must be invalid. Please check this variable!"
+                )
+        mission_info = MissionInfo(_map_info, mission["origin"], mission["target"])
+        if "seed" in mission:
+            kwargs = dict(kwargs, seed=mission["seed"])
+        planner = planner_cls(None, mission_info, *args, **kwargs)
+
+        status = planner.run()
+        ret["status"] = status.name
+        ret["stop_reason"] = planner.stop_reason
+        if status == Status.Success:
+            route_info = planner.get_route()
+            ret["length"] = float(route_info.get_length())
+            ret["route"] = np.asarray(route_info.get_route()).tolist()
+    except Exception as e:
+        # a bad mission is reported in its result instead of stopping the batch
+        ret["error"] = repr(e)
+    ret["time"] = time.perf_counter() - start
+
+    return ret
+
+
+def plan_missions(
+    atlas: NDArray[(Any, ...)],
+    missions: Iterable[Dict[str, Any]],
+    planner_cls: Type,
+    *args,
+    max_workers: int = None,
+    map_kwargs: dict = None,
+    **kwargs,
+) -> Iterator[Dict[str, Any]]:
+    """the generator to plan many missions on one map with a pool of worker processes
+
+    The map is written once into a temporary .npy file, and every worker builds its MapSpace on a read-only memory map
+    of that file, so the pages of the map are shared by the workers through the page cache without copy. The missions
+    are read lazily, with at most twice as many in flight as there are workers, and each result is yielded as soon as
+    its mission is done, so the results may come in another order than the missions.
+
+    Parameters
+    ----------
+    atlas : NDArray[(Any, ...)]
+        the array of map, as for MapSpace
+    missions : Iterable[Dict[str, Any]]
+        the missions with their "origin" and "target" coordinations, and optionally their "id" and "seed"
+    planner_cls : Type
+        the class of the planner, e.g. RRT_Star or A_Star
+    args
+        the arguments of the planner after drone_info and mission_info
+    max_workers : int, optional
+        the number of worker processes, by default the number of CPUs
+    map_kwargs : dict, optional
+        the other settings of the MapSpace of the workers, e.g. collision_mode, by default None
+    kwargs
+        the other settings of the planner, e.g. time_budget
+
+    Yields
+    ------
+    Dict[str, Any]
+        the result of each mission, see _plan_mission
+    """
+    grid = np.ascontiguousarray(atlas, dtype=np.uint8)
+    max_workers = max_workers or cpu_count()
+
+    fd, map_file = tempfile.mkstemp(suffix=".npy")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, grid)
+
+        with ProcessPoolExecutor(
+            max_workers,
+            initializer=_init_worker,
+            initargs=(map_file, map_kwargs or {}, planner_cls, args, kwargs),
+        ) as executor:
+            pending = set()
+            for mission in missions:
+                if len(pending) >= 2 * max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(executor.submit(_plan_mission, mission))
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+    finally:
+        # the workers are done once the pool is shut down, so the file is no longer mapped
+        os.remove(map_file)
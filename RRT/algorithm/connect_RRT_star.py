@@ -1,16 +1,17 @@
 from __future__ import annotations
 
 import numpy as np
-from typing import List
+from typing import List, Union
 from RRT.algorithm.RRT_template import RRT_Template
 from RRT.core.info import DroneInfo
 from RRT.core.mission_info import MissionInfo
+from RRT.core.neighbor_policy import NeighborPolicy
 from RRT.core.route_info import RouteInfo
-from RRT.core.sign import AlgStatus, Status
+from RRT.core.sign import AlgStatus
 from RRT.core.tree import Tree, TreeNode
 from RRT.util.distcalc import dist_calc
 from RRT.util.path_cat import cat_path
-from RRT.util.samplemethod import steer
+from RRT.util.samplemethod import InformedSampler, steer
 
 
 class Connect_RRT_Star(RRT_Template):
@@ -24,6 +25,9 @@ class Connect_RRT_Star(RRT_Template):
         step_size: np.float64,
         neighbor_num: np.int32 = 5,
         max_attempts: np.int32 = np.inf,
+        informed: bool = False,
+        neighbor_policy: Union[str, NeighborPolicy] = "fixed",
+        **kwargs,
     ):
         """the init method of RRT
 
@@ -37,81 +41,90 @@ class Connect_RRT_Star(RRT_Template):
             the size/length of each step
         max_attempts : np.int32, optional
             the maximum number of attempts, by default np.inf
+        informed : bool, optional
+            whether to sample only the points that may shorten the route once a route is found (informed RRT*), by
+            default False
+        neighbor_policy : Union[str, NeighborPolicy], optional
+            the rule of the neighbors for choose-parent and rewire, or its name ("fixed" for the neighbor_num nearest
+            nodes, "radius" or "knn" for the shrinking rules with the default constants, see NeighborPolicy), by
+            default 'fixed'
+        kwargs
+            the other settings passed to RRT_Template, e.g. seed
         """
         super().__init__(
-            drone_info, mission_info, explore_prob, step_size, max_attempts
+            drone_info, mission_info, explore_prob, step_size, max_attempts, **kwargs
         )
         self.neighbor_num = neighbor_num
+        if isinstance(neighbor_policy, str):
+            neighbor_policy = NeighborPolicy(
+                self.map_info, neighbor_policy, neighbor_num, max_radius=step_size
+            )
+        self.neighbor_policy: NeighborPolicy = neighbor_policy
+        if informed:
+            self.informed_sampler = InformedSampler(
+                mission_info.origin,
+                mission_info.target,
+                self.map_info.min_border,
+                self.map_info.max_border,
+                seed=self.sampler.rng,
+            )
         self.forward_tree: Tree = Tree(mission_info.origin)
         self.backward_tree: Tree = Tree(mission_info.target)
         self.trees = [self.forward_tree, self.backward_tree]
 
-    def run(self) -> bool:
-        """the method to run the basic RRT algorithm
-
-        Returns
-        -------
-        bool
-            whether basic RRT algorithm reach the target from origin
-        """
-        attempt_cnt = 0
-        while True:
-            # loop ctrl condition
-            if np.isfinite(self.max_attempts) and attempt_cnt > self.max_attempts:
-                break
-            elif np.isinf(self.max_attempts) and self.final_ret is not None:
-                break
-
-            # loop start
-            attempt_cnt += 1
+    def iterate(self):
+        """the method to run one attempt of the algorithm"""
+        new_sample = self.sample(self.trees[-1].nodes[0].coord)
+        nearest, _ = self.trees[0].get_nearest_neighbors(new_sample)
+        new_sample = steer(nearest[0].coord, new_sample, self.step_size)
+        neighbors, _ = self.neighbor_policy.query(self.trees[0], new_sample, nearest[0])
 
-            new_sample = self.sample(self.trees[-1].nodes[0].coord)
-            neighbors, neighbor_dist = self.trees[0].get_nearest_neighbors(new_sample, self.neighbor_num)
-            new_sample = steer(neighbors[np.argmin(neighbor_dist)].coord, new_sample, self.step_size)
-
-            sample_node = TreeNode(new_sample)
+        sample_node = TreeNode(new_sample)
+        if (
+            self.extend(self.trees[0], sample_node, neighbors)
+            != AlgStatus.Trapped
+        ):
             if (
-                self.extend(self.trees[0], sample_node, neighbors)
-                != AlgStatus.Trapped
+                self.connect(self.trees[1], sample_node) == AlgStatus.Reached
+                and self.validate_connection(sample_node)
             ):
-                if self.connect(self.trees[1], sample_node) == AlgStatus.Reached:
-                    ret = cat_path(
-                        self.forward_tree.get_route(
-                            self.forward_tree.get_node(sample_node)
-                        ),
-                        self.backward_tree.get_route(
-                            self.backward_tree.get_node(sample_node)
-                        ),
-                    )
-                    if self.final_ret is None:
-                        self.final_ret = ret
-                    elif ret.get_length() < self.final_ret.get_length():
-                        self.final_ret = ret
-
-            self.swap_tree()
-
-        if self.final_ret is not None:
-            return Status.Success
-        return Status.Failure
+                ret = cat_path(
+                    self.forward_tree.get_route(
+                        self.forward_tree.get_node(sample_node)
+                    ),
+                    self.backward_tree.get_route(
+                        self.backward_tree.get_node(sample_node)
+                    ),
+                )
+                if self.final_ret is None:
+                    self.final_ret = ret
+                elif ret.get_length() < self.final_ret.get_length():
+                    self.final_ret = ret
+
+        self.swap_tree()
 
     def extend(self, tree: Tree, sample_node, neighbors):
         collision_free_list = self.neighbor_collision_free(sample_node.coord, neighbors)
         parent = self.choose_parent(sample_node.coord, neighbors, collision_free_list)
         if parent is None:
             return AlgStatus.Trapped
+        # in lazy mode only the leaves may hang by unchecked edges, so that a wall crossed by an optimistic edge is
+        # found before a subtree grows behind it
+        if self.lazy and not self.validate_route(tree, parent.index):
+            return AlgStatus.Trapped
 
-        new_node = tree.add_node(sample_node.coord, parent)
+        new_node = tree.add_node(sample_node.coord, parent, not self.lazy)
 
-        self.rewire(new_node, neighbors, collision_free_list)
+        if not self.rewire(new_node, neighbors, collision_free_list):
+            return AlgStatus.Trapped
 
         return AlgStatus.Advanced
 
     def connect(self, tree: Tree, sample_node):
         while True:
-            neighbor_nodes, neighbor_dist = tree.get_nearest_neighbors(sample_node.coord, self.neighbor_num)
-            new_sample = steer(
-                neighbor_nodes[np.argmin(neighbor_dist)].coord, sample_node.coord, self.step_size
-            )
+            nearest, _ = tree.get_nearest_neighbors(sample_node.coord)
+            new_sample = steer(nearest[0].coord, sample_node.coord, self.step_size)
+            neighbor_nodes, _ = self.neighbor_policy.query(tree, new_sample, nearest[0])
             dist = dist_calc(sample_node.coord, new_sample)
 
             status = self.extend(tree, TreeNode(new_sample), neighbor_nodes)
@@ -122,35 +135,40 @@ class Connect_RRT_Star(RRT_Template):
                 return AlgStatus.Reached
 
     def neighbor_collision_free(self, new_sample, neighbors):
-        ret = []
-        for neighbor in neighbors:
-            collision_free = self.map_info.collision_free(
-                RouteInfo([neighbor]).append(TreeNode(new_sample))
-            )
-            ret.append(collision_free)
-        return ret
+        return self.edges_free([neighbor.coord for neighbor in neighbors], new_sample)
 
     def choose_parent(self, new_sample, neighbors, collision_free_list):
-        min_dist = np.inf
-        sample_node = TreeNode(new_sample)
-        for idx, neighbor in enumerate(neighbors):
-            if not collision_free_list[idx]:
-                continue
-            dist = dist_calc(neighbor.coord, new_sample)
-            if dist < min_dist:
-                sample_node.parent = neighbor
-        return sample_node.parent
+        # the parent is the collision-free neighbor giving the lowest cost to the new sample
+        costs = np.array([neighbor.cost for neighbor in neighbors]) + np.linalg.norm(
+            np.array([neighbor.coord for neighbor in neighbors]) - new_sample, axis=1
+        )
+        costs[~np.asarray(collision_free_list)] = np.inf
+        if np.isinf(costs).all():
+            return None
+        return neighbors[int(np.argmin(costs))]
 
     def rewire(
         self, sample_node: TreeNode, neighbors: List[TreeNode], collision_free_list
     ):
-        for idx, neighbor in enumerate(neighbors):
-            if not collision_free_list[idx]:
+        dists = np.linalg.norm(
+            np.array([neighbor.coord for neighbor in neighbors]) - sample_node.coord,
+            axis=1,
+        )
+        validated = not self.lazy
+        for idx in np.flatnonzero(collision_free_list):
+            neighbor = neighbors[idx]
+            if sample_node.cost + dists[idx] >= neighbor.cost:
+                continue
+            # in lazy mode the rewired subtrees must not hang by unchecked edges, so the edges are checked here
+            if not validated:
+                if not self.validate_route(sample_node.tree, sample_node.index):
+                    return False
+                validated = True
+            if self.lazy and not self.map_info.segment_free(sample_node.coord, neighbor.coord):
                 continue
-            dist = dist_calc(neighbor.coord, sample_node.coord)
-            if sample_node.cost + dist < neighbor.cost:
-                neighbor.parent = sample_node
-                neighbor.cost = sample_node.cost + dist
+            sample_node.tree.rewire(neighbor, sample_node)
+
+        return True
 
     def get_route(self) -> RouteInfo:
         """the instance method to get route info
@@ -162,6 +180,20 @@ class Connect_RRT_Star(RRT_Template):
         """
         return self.final_ret
 
+    def validate_connection(self, sample_node) -> bool:
+        """the method to check the routes from the roots of both trees to the node connecting them
+
+        Returns
+        -------
+        bool
+            whether both routes are collision-free, see RRT_Template.validate_route
+        """
+        return self.validate_route(
+            self.forward_tree, self.forward_tree.find(sample_node.coord)
+        ) and self.validate_route(
+            self.backward_tree, self.backward_tree.find(sample_node.coord)
+        )
+
     def swap_tree(self):
         self.trees.reverse()
 
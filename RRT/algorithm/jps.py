@@ -0,0 +1,428 @@
+from __future__ import annotations
+
+import functools
+import heapq
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Union
+
+import numpy as np
+from RRT.algorithm.a_star import A_Star, neighbor_offsets, octile_distance
+from RRT.core.info import DroneInfo
+from RRT.core.map_space import MapSpace
+from RRT.core.mission_info import MissionInfo
+from RRT.core.route_info import RouteInfo
+from RRT.core.sign import Status
+
+if TYPE_CHECKING:
+    from nptyping import NDArray
+
+
+@functools.lru_cache(maxsize=None)
+def pruning_witnesses(ndim: int) -> Tuple[Tuple[Tuple[int, ...], ...], ...]:
+    """the method to derive the neighbor pruning rules of Jump Point Search for any number of dimension
+
+    Arriving at the cell x from its neighbor p = x - d, the move on to the neighbor n = x + e is pruned when some path
+    from p to n inside the 3^ndim block around x avoids x and is shorter than p-x-n, or is as short and moves along more
+    dimensions at once earlier (the diagonal-first order of the canonical paths). Such a path is a witness, and the
+    move is pruned whenever all the cells along one of its witnesses are not walls. With no walls around, the moves
+    left are exactly the natural ones, along the dimensions of d with the same signs.
+
+    Parameters
+    ----------
+    ndim : int
+        the number of dimension
+
+    Returns
+    -------
+    Tuple[Tuple[Tuple[int, ...], ...], ...]
+        the minimal witnesses of each incoming direction d and next direction e, as bitmasks of the cells passed by the
+        path, with the bit i standing for the cell x + offsets[i] of neighbor_offsets(ndim)
+    """
+    offsets, move_costs = neighbor_offsets(ndim)
+    offsets = [tuple(offset) for offset in offsets.tolist()]
+    move_costs = move_costs.tolist()
+    components = [sum(x != 0 for x in offset) for offset in offsets]
+    index = {offset: i for i, offset in enumerate(offsets)}
+    center = (0,) * ndim
+    eps = 1e-9
+
+    ret = []
+    for d, direction in enumerate(offsets):
+        parent = tuple(-x for x in direction)
+        bound = move_costs[d] + max(move_costs) + eps
+
+        # enumerate the paths from the parent around the center by depth-first search
+        found = [set() for _ in offsets]
+        stack = [(parent, 0.0, (), 0)]
+        while stack:
+            cell, cost, order, passed = stack.pop()
+            e = index[cell]
+            via_cost = move_costs[d] + move_costs[e]
+            if cost < via_cost - eps or (
+                cost <= via_cost + eps and order > (components[d], components[e])
+            ):
+                found[e].add(passed)
+
+            if cell != parent:
+                passed |= 1 << e
+            for m, move in enumerate(offsets):
+                next_cell = tuple(x + y for x, y in zip(cell, move))
+                if (
+                    next_cell == center
+                    or next_cell == parent
+                    or any(abs(x) > 1 for x in next_cell)
+                    or passed >> index[next_cell] & 1
+                    or cost + move_costs[m] > bound
+                ):
+                    continue
+                stack.append(
+                    (next_cell, cost + move_costs[m], order + (components[m],), passed)
+                )
+
+        witnesses = []
+        for passed_set in found:
+            minimal = []
+            for passed in sorted(passed_set, key=lambda x: bin(x).count("1")):
+                if not any(other & passed == other for other in minimal):
+                    minimal.append(passed)
+            witnesses.append(tuple(minimal))
+        ret.append(tuple(witnesses))
+
+    return tuple(ret)
+
+
+class JumpTable:
+    """the per-map tables of Jump Point Search
+
+    The map is padded with a wall border and its cells are numbered in the flat order. For every incoming direction,
+    the moves left after pruning are tabulated for each pattern of walls around a cell, so the pruning of a cell is a
+    single lookup. With jump_distance, the distance to the next jump point along every direction is also tabulated
+    for every cell (JPS+); the tables do not depend on the origin and the target, so they can be shared by every
+    mission on the map.
+    """
+
+    def __init__(self, map_info: MapSpace, jump_distance: bool = True):
+        """the initial method for JumpTable
+
+        Parameters
+        ----------
+        map_info : MapSpace
+            the map information
+        jump_distance : bool, optional
+            whether to tabulate the jump distances, by default True
+        """
+        free = np.pad(~map_info.wall_mask(), 1, constant_values=False)
+        self.shape: Tuple[int, ...] = free.shape
+        self.strides: List[int] = np.cumprod((1,) + self.shape[:0:-1])[::-1].tolist()
+        free = free.ravel()
+        cells = np.flatnonzero(free)
+
+        directions, move_costs = neighbor_offsets(map_info.ndim)
+        self.directions: List[Tuple[int, ...]] = [tuple(x) for x in directions.tolist()]
+        self.move_costs: List[float] = move_costs.tolist()
+        self.offsets: List[int] = (directions @ self.strides).tolist()
+        # the directions along a part of the dimensions of each direction with the same signs, excluding itself
+        self.sub_directions: List[List[int]] = [
+            [
+                e
+                for e, sub in enumerate(self.directions)
+                if e != d and all(x == 0 or x == y for x, y in zip(sub, direction))
+            ]
+            for d, direction in enumerate(self.directions)
+        ]
+
+        # the bit i of the pattern of a cell tells whether its neighbor i is free, the walls have no pattern
+        patterns = np.zeros(cells.shape[0], dtype=np.int64)
+        for i, offset in enumerate(self.offsets):
+            patterns |= free[cells + offset].astype(np.int64) << i
+        patterns, kinds = np.unique(patterns, return_inverse=True)
+        self.free: List[bool] = free.tolist()
+        self.neighbors: List[int] = patterns.tolist()
+        cell_kinds: np.ndarray = np.zeros(free.shape[0], dtype=np.intp)
+        cell_kinds[cells] = kinds
+        self.kinds: List[int] = cell_kinds.tolist()
+
+        witnesses = pruning_witnesses(map_info.ndim)
+        self.successors: List[List[int]] = []
+        self.forced: List[List[bool]] = []
+        for d in range(len(self.directions)):
+            pruned = np.zeros_like(patterns)
+            for e in range(len(self.directions)):
+                for passed in witnesses[d][e]:
+                    pruned |= ((patterns & passed) == passed).astype(np.int64) << e
+            successors = patterns & ~pruned
+            natural = sum(1 << e for e in self.sub_directions[d] + [d])
+            self.successors.append(successors.tolist())
+            self.forced.append(((successors & ~natural) != 0).tolist())
+
+        self.jump_distances: List[NDArray[Any]] = None
+        if jump_distance:
+            self.jump_distances = self._tabulate_jump_distances(free, cells)
+
+    def _tabulate_jump_distances(
+        self, free: NDArray[Any], cells: NDArray[Any]
+    ) -> List[NDArray[Any]]:
+        """the private method to tabulate the jump distances of every direction
+
+        The table of a direction holds, for each free cell, t > 0 if the first jump point along the direction is t steps
+        away, or -t if there are t free steps before the wall and no jump point. A cell is a jump point of a direction
+        if it has forced neighbors or the jump along a sub-direction from it finds a jump point, so the directions are
+        tabulated from the straight ones up, each by a sweep in the order opposite to the direction.
+
+        Parameters
+        ----------
+        free : NDArray[Any]
+            whether each cell of the padded map is free
+        cells : NDArray[Any]
+            the free cells
+
+        Returns
+        -------
+        List[NDArray[Any]]
+            the jump distances of each direction
+        """
+        coords = np.array(np.unravel_index(cells, self.shape)).T
+        kinds = np.asarray(self.kinds)
+        tables = [None] * len(self.directions)
+        for d in sorted(
+            range(len(self.directions)), key=lambda x: len(self.sub_directions[x])
+        ):
+            is_jump = np.zeros(free.shape[0], dtype=bool)
+            is_jump[cells] = np.asarray(self.forced[d])[kinds[cells]]
+            for e in self.sub_directions[d]:
+                is_jump |= tables[e] > 0
+
+            # the cells of the same level along the direction do not depend on each other
+            levels = coords @ self.directions[d]
+            order = np.argsort(-levels, kind="stable")
+            bounds = np.flatnonzero(np.diff(levels[order])) + 1
+
+            table = np.zeros(free.shape[0], dtype=np.int32)
+            for level in np.split(cells[order], bounds):
+                next_cells = level + self.offsets[d]
+                steps = table[next_cells]
+                table[level] = np.where(
+                    ~free[next_cells],
+                    0,
+                    np.where(is_jump[next_cells], 1, np.where(steps > 0, steps + 1, steps - 1)),
+                )
+            tables[d] = table
+
+        return tables
+
+    def coord(self, idx: int) -> Tuple[int, ...]:
+        """the instance method to get the coordination of a cell in the padded map
+
+        Parameters
+        ----------
+        idx : int
+            the flat index of the cell
+
+        Returns
+        -------
+        Tuple[int, ...]
+            the coordination of the cell
+        """
+        ret = []
+        for stride in self.strides:
+            x, idx = divmod(idx, stride)
+            ret.append(x)
+        return tuple(ret)
+
+
+class JPS(A_Star):
+    """Jump Point Search on the grid of the map
+
+    It finds a route of the same (optimal) cost as A_Star, with the same moves and costs, but only expands the jump
+    points: the symmetric routes are pruned and straight runs are skipped over. With a jump table holding the jump
+    distances (JPS+), each jump takes constant time.
+    """
+
+    def __init__(
+        self,
+        drone_info: DroneInfo,
+        mission_info: MissionInfo,
+        *args,
+        jump_table: Union[bool, JumpTable] = False,
+        **kwargs
+    ):
+        """the initial method for JPS
+
+        Parameters
+        ----------
+        drone_info : DroneInfo
+            the drone infomation
+        mission_info : MissionInfo
+            the mission infomation
+        jump_table : Union[bool, JumpTable], optional
+            the JumpTable of the map, or whether to build it with the jump distances (JPS+) on the first run, by
+            default False (build it without the jump distances)
+        """
+        super().__init__(drone_info, mission_info, *args, **kwargs)
+        self.jump_table: JumpTable = None
+        self.jump_distance: bool = bool(jump_table)
+        if isinstance(jump_table, JumpTable):
+            self.jump_table = jump_table
+
+    def run(self) -> bool:
+        """the method to run the JPS algorithm
+
+        Returns
+        -------
+        bool
+            whether JPS algorithm reach the target from origin
+        """
+        map_info = self.mission_info.map_info
+        if self.jump_table is None:
+            self.jump_table = JumpTable(map_info, self.jump_distance)
+        table = self.jump_table
+        assert table.shape == tuple(size + 2 for size in map_info.shape)
+
+        origin = self.mission_info.extract_origin_info() + 1
+        target = self.mission_info.extract_target_info() + 1
+        origin_idx = int(np.dot(origin, table.strides))
+        target_idx = int(np.dot(target, table.strides))
+        target_coord = tuple(target.tolist())
+
+        costs: Dict[int, float] = {origin_idx: 0.0}
+        parents: Dict[int, int] = {origin_idx: -1}
+        directions: Dict[int, int] = {}
+        closed = set()
+
+        open_list = [(octile_distance(origin, target), 0, origin_idx)]
+        counter = 1
+        self.expanded = 0
+        deadline = time.monotonic() + self.time_budget
+        while open_list:
+            _, _, idx = heapq.heappop(open_list)
+            if idx in closed:
+                continue
+            closed.add(idx)
+            self.expanded += 1
+            if idx == target_idx:
+                break
+            if self._out_of_time(deadline):
+                return Status.Failure
+
+            if idx == origin_idx:
+                moves = table.neighbors[table.kinds[idx]]
+            else:
+                moves = table.successors[directions[idx]][table.kinds[idx]]
+            for e in _bits(moves):
+                if table.jump_distances is None:
+                    jump_point = _jump(table, idx, e, target_idx)
+                else:
+                    jump_point = _jump_with_distance(table, idx, e, target_coord)
+                if jump_point < 0 or jump_point in closed:
+                    continue
+
+                steps = (jump_point - idx) // table.offsets[e]
+                new_cost = costs[idx] + steps * table.move_costs[e]
+                if new_cost < costs.get(jump_point, np.inf):
+                    costs[jump_point] = new_cost
+                    parents[jump_point] = idx
+                    directions[jump_point] = e
+                    estimate = octile_distance(table.coord(jump_point), target)
+                    heapq.heappush(open_list, (new_cost + estimate, counter, jump_point))
+                    counter += 1
+        else:
+            self.stop_reason = "unreachable"
+            return Status.Failure
+
+        self.stop_reason = "solved"
+        # fill the straight runs between the jump points with their cells
+        route = [target_idx]
+        idx = target_idx
+        while parents[idx] >= 0:
+            offset = table.offsets[directions[idx]]
+            route.extend(range(idx - offset, parents[idx] - offset, -offset))
+            idx = parents[idx]
+        route.reverse()
+        coords = np.array(np.unravel_index(route, table.shape)).T - 1
+        self.final_ret = RouteInfo.from_coords(coords, costs[target_idx])
+
+        return Status.Success
+
+
+@functools.lru_cache(maxsize=None)
+def _bits(mask: int) -> Tuple[int, ...]:
+    return tuple(i for i in range(mask.bit_length()) if mask >> i & 1)
+
+
+def _jump(table: JumpTable, idx: int, d: int, target_idx: int) -> int:
+    """the private method to jump from a cell along a direction by scanning cell by cell
+
+    Parameters
+    ----------
+    table : JumpTable
+        the jump table of the map
+    idx : int
+        the cell to jump from
+    d : int
+        the direction to jump along
+    target_idx : int
+        the target cell
+
+    Returns
+    -------
+    int
+        the jump point, -1 if a wall is reached first
+    """
+    offset, forced = table.offsets[d], table.forced[d]
+    while True:
+        idx += offset
+        if not table.free[idx]:
+            return -1
+        if idx == target_idx or forced[table.kinds[idx]]:
+            return idx
+        for e in table.sub_directions[d]:
+            if _jump(table, idx, e, target_idx) >= 0:
+                return idx
+
+
+def _jump_with_distance(
+    table: JumpTable, idx: int, d: int, target_coord: Tuple[int, ...]
+) -> int:
+    """the private method to jump from a cell along a direction with the tabulated jump distance
+
+    The jump points depending on the target are not tabulated. Along the direction, the target can only be reached
+    through the sub-directions once the cell is aligned with the target in one of the dimensions of the direction, so
+    the jump stops at the first such cell if it comes before the tabulated jump point. The cell is a jump point only if
+    the jump from it actually reaches the target, and stopping there anyway just splits the jump in two.
+
+    Parameters
+    ----------
+    table : JumpTable
+        the jump table of the map, with the jump distances
+    idx : int
+        the cell to jump from
+    d : int
+        the direction to jump along
+    target_coord : Tuple[int, ...]
+        the coordination of the target in the padded map
+
+    Returns
+    -------
+    int
+        the jump point, -1 if a wall is reached first
+    """
+    steps = int(table.jump_distances[d][idx])
+    free_steps = abs(steps)
+
+    aligned = free_steps + 1
+    for x, y, direction in zip(table.coord(idx), target_coord, table.directions[d]):
+        if direction == 0:
+            if x != y:
+                aligned = free_steps + 1
+                break
+        elif (y - x) * direction < 1:
+            aligned = free_steps + 1
+            break
+        else:
+            aligned = min(aligned, (y - x) * direction)
+
+    if aligned <= free_steps:
+        return idx + aligned * table.offsets[d]
+    if steps > 0:
+        return idx + steps * table.offsets[d]
+    return -1
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Tuple, Type
+
+import numpy as np
+from RRT.algorithm.RRT_template import Progress, RRT_Template
+from RRT.core.route_info import RouteInfo
+from RRT.core.sign import Status
+
+# the event telling the planners in a worker process to give up, set by the initializer of the pool
+_stop_event = None
+
+
+def _init_worker(stop_event):
+    global _stop_event
+    _stop_event = stop_event
+
+
+def _plan(
+    planner_cls: Type[RRT_Template],
+    args: tuple,
+    kwargs: dict,
+    seed: np.random.SeedSequence,
+    deadline: float,
+    step_num: int,
+) -> Tuple[RouteInfo, Progress, str]:
+    """the method to run one seeded copy of the planner in a worker process until it stops or it is told to stop
+
+    Returns
+    -------
+    Tuple[RouteInfo, Progress, str]
+        the route (None if there is none), the progress and the stop reason of the copy
+    """
+    planner = planner_cls(
+        *args,
+        seed=np.random.default_rng(seed),
+        time_budget=max(deadline - time.monotonic(), 0),
+        **kwargs,
+    )
+    for _ in planner.steps(step_num):
+        if _stop_event.is_set():
+            return planner.get_route(), planner.progress(), "cancelled"
+
+    return planner.get_route(), planner.progress(), planner.stop_reason
+
+
+class Parallel_RRT:
+    """independently seeded copies of a RRT planner run in a process pool, the first or the best route is taken
+
+    The runtime of RRT has a heavy tail, so the first of several copies to reach the target is usually much sooner
+    than a single run. The copies stop at the boundaries of their steps once the result is decided.
+    """
+
+    def __init__(
+        self,
+        planner_cls: Type[RRT_Template],
+        *args,
+        num: int = None,
+        max_workers: int = None,
+        seed: int = None,
+        time_budget: float = np.inf,
+        policy: str = "first",
+        step_num: int = 64,
+        **kwargs,
+    ):
+        """the initial method for Parallel_RRT
+
+        Parameters
+        ----------
+        planner_cls : Type[RRT_Template]
+            the class of the planner, e.g. RRT_Star
+        args
+            the arguments of the planner, e.g. drone_info, mission_info, explore_prob and step_size
+        num : int, optional
+            the number of copies, by default the number of workers
+        max_workers : int, optional
+            the number of worker processes, by default the number of CPUs
+        seed : int, optional
+            the seed the seeds of the copies are spawned from, by default None (unpredictable)
+        time_budget : float, optional
+            the maximum wall-clock seconds of the whole run, shared by the copies as their deadline, by default np.inf
+        policy : str, optional
+            "first" to take the first route found and cancel the other copies, or "best" to wait for all the copies
+            and take the shortest route, by default 'first'
+        step_num : int, optional
+            the number of attempts of a copy between two checks for cancellation, by default 64
+        kwargs
+            the other settings passed to the planner, except seed and time_budget
+
+        Raises
+        ------
+        ValueError
+            The variable [policy] is invalid.
+        """
+        if policy not in ("first", "best"):
+            raise ValueError(
+                "The variable [policy] must be invalid. Please check this variable!"
+            )
+
+        self.planner_cls: Type[RRT_Template] = planner_cls
+        self.args: tuple = args
+        self.kwargs: dict = kwargs
+        self.max_workers: int = max_workers or multiprocessing.cpu_count()
+        self.num: int = num or self.max_workers
+        self.seed: int = seed
+        self.time_budget: float = time_budget
+        self.policy: str = policy
+        self.step_num: int = step_num
+
+        # the (progress, stop reason) of each copy finished before the result is decided, in order of finishing
+        self.results: List[Tuple[Progress, str]] = []
+        self.final_ret: RouteInfo = None
+
+    def run(self) -> Status:
+        """the method to run the copies until the result is decided
+
+        Returns
+        -------
+        Status
+            whether any copy reach the target from origin
+        """
+        deadline = time.monotonic() + self.time_budget
+        seeds = np.random.SeedSequence(self.seed).spawn(self.num)
+        stop_event = multiprocessing.Event()
+
+        self.results = []
+        self.final_ret = None
+        with ProcessPoolExecutor(
+            self.max_workers, initializer=_init_worker, initargs=(stop_event,)
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _plan, self.planner_cls, self.args, self.kwargs, seed, deadline, self.step_num
+                )
+                for seed in seeds
+            ]
+            for future in as_completed(futures):
+                route, progress, stop_reason = future.result()
+                self.results.append((progress, stop_reason))
+                if route is not None and (
+                    self.final_ret is None or route.get_length() < self.final_ret.get_length()
+                ):
+                    self.final_ret = route
+
+                if self.policy == "first" and self.final_ret is not None:
+                    # the running copies stop at their next step, the waiting ones never start
+                    stop_event.set()
+                    for other in futures:
+                        other.cancel()
+                    break
+
+        if self.final_ret is not None:
+            return Status.Success
+        return Status.Failure
+
+    def get_route(self) -> RouteInfo:
+        """the instance method to get route info
+
+        Returns
+        -------
+        RouteInfo
+            the route information containing the route from origin to target
+        """
+        return self.final_ret
@@ -1,23 +1,19 @@
 import os
 
-from RRT.config.config_update import config_update
-from RRT.config.map_info_loader import MapInfoLoader
-from RRT.config.universal_config_loader import UniversalConfigLoader
+from RRT.config.map_registry import MapRegistry
 
-# universal config loader
-config_dir = "./RRT/config/"
+config_dir = os.path.dirname(os.path.abspath(__file__))
 config_file_name = "base-config.yaml"
-config_loader = UniversalConfigLoader()
-config_update(config_dir, config_file_name, os.path.join(config_dir, "map"))
-config_loader.appendConfig(os.path.join(config_dir, "base-config.yaml"))
 
-# map info loader
-map_loader = MapInfoLoader()
-for map_file_name in config_loader.get_attr().SYSTEM.MAP:
-    map_loader.load_map(os.path.join(config_dir, "map", map_file_name))
+# map registry, the maps are only read when they are used
+map_loader = MapRegistry(os.path.join(config_dir, "map"))
+
+# universal config loader, created on the first use since it needs yacs
+_config_loader = None
+
 
 # extern function to get above singleton or their attributes
-def get_config() -> UniversalConfigLoader:
+def get_config():
     """return config loader singleton
 
     Returns
@@ -25,15 +21,28 @@ def get_config() -> UniversalConfigLoader:
     UniversalConfigLoader
         config loader singleton
     """
-    return config_loader
+    global _config_loader
+    if _config_loader is None:
+        from RRT.config.universal_config_loader import UniversalConfigLoader
+
+        _config_loader = UniversalConfigLoader()
+        _config_loader.appendConfig(os.path.join(config_dir, config_file_name))
+    return _config_loader
 
 
-def get_map_config() -> MapInfoLoader:
-    """return map loader singleton
+def get_map_config() -> MapRegistry:
+    """return map registry singleton
 
     Returns
     -------
-    MapInfoLoader
-        config map singleton
+    MapRegistry
+        map registry singleton
     """
     return map_loader
+
+
+def __getattr__(name):
+    # config_loader is still importable from the package, but only built on access
+    if name == "config_loader":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
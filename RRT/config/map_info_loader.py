@@ -1,27 +1,72 @@
 import os
 from typing import Text
 
-from RRT.config.config_loader import ConfigLoader
-from yacs.config import CfgNode
+import numpy as np
 
+# the postfixes of the binary map files, which need no parse
+BINARY_POSTFIXES = (".npy",)
 
-class MapInfoLoader(ConfigLoader):
-    def __init__(
-        self,
-    ):
-        self.container = {}
 
-    def load_map(self, map_file_name: Text):
-        file_name = os.path.basename(map_file_name).rsplit(".", maxsplit=1)[0]
-        if file_name in self.container.keys():
-            return
+def read_yaml_map(map_file_name: Text) -> np.ndarray:
+    """the method to parse a YAML map file, whose MAP is the nested list of the cells, with the C parser if there is
 
-        config = CfgNode()
-        config.MAP = None
-        config.merge_from_file(map_file_name)
+    Parameters
+    ----------
+    map_file_name : Text
+        the path of the map file
 
-        self.container[file_name] = config.MAP
+    Returns
+    -------
+    np.ndarray
+        the uint8 array of the map
+    """
+    import yaml
 
-    def get_map(self, map_name):
-        assert map_name in self.container.keys()
-        return self.container[map_name]
+    with open(map_file_name, "r", encoding="utf-8") as f:
+        config = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+    return np.asarray(config["MAP"], dtype=np.uint8)
+
+
+def read_map(map_file_name: Text) -> np.ndarray:
+    """the method to read a map file of any format
+
+    A binary (.npy) map is memory-mapped read-only, so it is loaded without parse or copy whatever its size and its
+    cells are only read from disk when they are used. A YAML map is parsed by read_yaml_map.
+
+    Parameters
+    ----------
+    map_file_name : Text
+        the path of the map file
+
+    Returns
+    -------
+    np.ndarray
+        the uint8 array of the map, memory-mapped read-only if the file is binary
+    """
+    if os.path.splitext(map_file_name)[1] in BINARY_POSTFIXES:
+        return np.load(map_file_name, mmap_mode="r")
+
+    return read_yaml_map(map_file_name)
+
+
+def convert_map(map_file_name: Text, output: Text = None) -> Text:
+    """the method to convert a YAML map file into the binary format, a .npy file of the uint8 cells
+
+    Parameters
+    ----------
+    map_file_name : Text
+        the path of the YAML map file
+    output : Text, optional
+        the path of the binary map file, by default the path of the YAML map file with the postfix .npy
+
+    Returns
+    -------
+    Text
+        the path of the binary map file
+    """
+    if output is None:
+        output = os.path.splitext(map_file_name)[0] + ".npy"
+    np.save(output, read_yaml_map(map_file_name))
+
+    return output
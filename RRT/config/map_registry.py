@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, List, Text
+
+import numpy as np
+from RRT.config.map_info_loader import BINARY_POSTFIXES, read_map
+
+# the postfixes of the map files, the binary maps are preferred to the YAML maps of the same name
+MAP_POSTFIXES = BINARY_POSTFIXES + (".yaml", ".yml")
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+def map_hash(atlas: np.ndarray) -> Text:
+    """the method to hash the cells of a map, the same whatever the format of its file
+
+    Parameters
+    ----------
+    atlas : np.ndarray
+        the array of map
+
+    Returns
+    -------
+    Text
+        the sha1 hex digest of the shape and the uint8 cells
+    """
+    atlas = np.ascontiguousarray(atlas, dtype=np.uint8)
+    digest = hashlib.sha1(repr(atlas.shape).encode())
+    digest.update(memoryview(atlas).cast("B"))
+
+    return digest.hexdigest()
+
+
+class MapRegistry:
+    """the maps of a directory, indexed by name and loaded lazily
+
+    The index (the manifest) maps each name to the path, and the shape, the fingerprint (size and mtime of the file)
+    and the hash of the map if known. It is read from the manifest file of the directory if there is one, otherwise
+    the directory is listed, and it is only built on the first use. A map is loaded on its first get_map into a cache
+    bounded in bytes, where the least recently used maps are evicted first, and checked against the fingerprint and
+    the shape in the manifest, which costs a stat and no read of the cells. The hash of the cells is only checked if
+    verify is set. Nothing is written unless write_manifest is called.
+    """
+
+    def __init__(self, map_dir: Text, max_bytes: int = 1 << 30, verify: bool = False):
+        """the initial method for MapRegistry
+
+        Parameters
+        ----------
+        map_dir : Text
+            the directory of the map files
+        max_bytes : int, optional
+            the maximum bytes of the cached maps, by default 1 GiB. The latest map is kept even if it is larger
+        verify : bool, optional
+            whether to check each loaded map against the hash in the manifest too, by default False. It reads every
+            cell of the map, i.e. the whole file of a memory-mapped map
+        """
+        self.map_dir: Text = map_dir
+        self.max_bytes: int = max_bytes
+        self.verify: bool = verify
+        self._manifest: Dict[Text, Dict] = None
+        self._cache: "OrderedDict[Text, np.ndarray]" = OrderedDict()
+        self._cache_bytes: int = 0
+
+    def _scan(self) -> Dict[Text, Dict]:
+        """the private method to list the map files of the directory
+
+        Returns
+        -------
+        Dict[Text, Dict]
+            the manifest entries with only the path (relative to the directory) of each map
+        """
+        files = {}
+        with os.scandir(self.map_dir) as entries:
+            for entry in entries:
+                name, postfix = os.path.splitext(entry.name)
+                if entry.is_file() and postfix in MAP_POSTFIXES:
+                    files.setdefault(name, []).append(entry.name)
+
+        return {
+            name: {
+                "path": min(paths, key=lambda path: MAP_POSTFIXES.index(os.path.splitext(path)[1])),
+                "shape": None,
+                "size": None,
+                "mtime": None,
+                "hash": None,
+            }
+            for name, paths in files.items()
+        }
+
+    @property
+    def manifest(self) -> Dict[Text, Dict]:
+        """the index of the maps, read from the manifest file or listed from the directory on the first access"""
+        if self._manifest is None:
+            manifest_file = os.path.join(self.map_dir, MANIFEST_FILE_NAME)
+            if os.path.isfile(manifest_file):
+                with open(manifest_file, "r", encoding="utf-8") as f:
+                    self._manifest = json.load(f)
+            else:
+                self._manifest = self._scan()
+
+        return self._manifest
+
+    def names(self) -> List[Text]:
+        """the instance method to get the names of the maps
+
+        Returns
+        -------
+        List[Text]
+            the names in order
+        """
+        return sorted(self.manifest.keys())
+
+    def _fingerprint(self, name: Text) -> Dict[Text, int]:
+        """the private method to get the fingerprint of a map file, which changes with its content in practice
+
+        Parameters
+        ----------
+        name : Text
+            the name of the map
+
+        Returns
+        -------
+        Dict[Text, int]
+            the size in bytes and the mtime in nanoseconds of the file
+        """
+        stat = os.stat(os.path.join(self.map_dir, self.manifest[name]["path"]))
+        return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+    def _read(self, name: Text) -> np.ndarray:
+        """the private method to read a map from its file, memory-mapped if it is binary
+
+        Parameters
+        ----------
+        name : Text
+            the name of the map
+
+        Returns
+        -------
+        np.ndarray
+            the read-only uint8 array of the map
+        """
+        atlas = read_map(os.path.join(self.map_dir, self.manifest[name]["path"]))
+        # the cached map is shared by every caller, so it must not be changed in place
+        atlas.flags.writeable = False
+        return atlas
+
+    def get_map(self, map_name: Text) -> np.ndarray:
+        """the instance method to get a map, loaded and cached on the first call
+
+        Parameters
+        ----------
+        map_name : Text
+            the name of the map, i.e. the file name without postfix
+
+        Returns
+        -------
+        np.ndarray
+            the read-only uint8 array of the map, memory-mapped if its file is binary
+
+        Raises
+        ------
+        ValueError
+            The map does not match the fingerprint, the shape or (if verify is set) the hash in the manifest, i.e.
+            the file changed after the manifest was written.
+        """
+        if map_name in self._cache:
+            self._cache.move_to_end(map_name)
+            return self._cache[map_name]
+
+        # a map added after the manifest is read is found by listing the directory again
+        if map_name not in self.manifest:
+            self._manifest = dict(self._scan(), **self._manifest)
+        assert map_name in self.manifest
+
+        entry = self.manifest[map_name]
+        fingerprint = self._fingerprint(map_name) if entry.get("size") is not None else None
+        atlas = self._read(map_name)
+        if (
+            (fingerprint is not None and any(entry.get(key) != value for key, value in fingerprint.items()))
+            or (entry.get("shape") is not None and list(atlas.shape) != entry["shape"])
+            or (self.verify and entry.get("hash") is not None and map_hash(atlas) != entry["hash"])
+        ):
+            raise ValueError(
+                f"The map [{map_name}] does not match its manifest. Please write the manifest again!"
+            )
+        entry["shape"] = list(atlas.shape)
+
+        self._cache[map_name] = atlas
+        self._cache_bytes += atlas.nbytes
+        while self._cache_bytes > self.max_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted.nbytes
+
+        return atlas
+
+    def write_manifest(self) -> Text:
+        """the instance method to index every map of the directory with its shape, fingerprint and hash and write the
+        manifest file
+
+        Each map is read once, without going through the cache. The file is replaced at once, so the processes
+        reading it never see a partial manifest. The fingerprints hold the mtimes of the files, so the manifest must be
+        written again wherever the files are copied or checked out.
+
+        Returns
+        -------
+        Text
+            the path of the manifest file
+        """
+        manifest = self._scan()
+        self._manifest = manifest
+        for name, entry in manifest.items():
+            atlas = self._read(name)
+            entry["shape"] = list(atlas.shape)
+            entry.update(self._fingerprint(name))
+            entry["hash"] = map_hash(atlas)
+
+        manifest_file = os.path.join(self.map_dir, MANIFEST_FILE_NAME)
+        temp_file = f"{manifest_file}.{os.getpid()}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(temp_file, manifest_file)
+
+        return manifest_file
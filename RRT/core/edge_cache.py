@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import sys
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Hashable, Optional
+
+from RRT.util.arrayhash import array_key
+
+if TYPE_CHECKING:
+    from nptyping import NDArray
+
+# the bytes an OrderedDict spends on each entry besides its key and value, i.e. its slots and its linked list node
+ENTRY_OVERHEAD = 104
+
+
+def entry_bytes(key: Hashable) -> int:
+    """the method to estimate the memory taken by one cache entry
+
+    Parameters
+    ----------
+    key : Hashable
+        the key of the entry, a tuple of its parts as made by EdgeCache.key
+
+    Returns
+    -------
+    int
+        the bytes of the key and its parts plus the overhead of the entry, the value (a shared bool) excluded
+    """
+    size = sys.getsizeof(key) + ENTRY_OVERHEAD
+    if isinstance(key, tuple):
+        size += sum(sys.getsizeof(part) for part in key)
+
+    return size
+
+
+class EdgeCache:
+    """the LRU cache of the collision results of straight segments
+
+    The key of a segment is the pair of its quantized endpoints in either order, so a segment and its reverse share
+    one entry. When the cache is full, by its number of entries or by its estimated bytes, the least recently used
+    entries are dropped. The keys do not tell the maps apart,
+    so a cache is bound to the first MapSpace it is given to and cannot be shared with another one.
+    """
+
+    def __init__(self, max_entries: int = 100000, tolerance: float = 0, max_bytes: int = None):
+        """the initial method for EdgeCache
+
+        Parameters
+        ----------
+        max_entries : int, optional
+            the maximum number of cached segments, by default 100000
+        tolerance : float, optional
+            the quantization size of the endpoints, the segments whose endpoints quantize to the same cells share the
+            result, by default 0 (exact match)
+        max_bytes : int, optional
+            the maximum memory of the cached segments, estimated entry by entry with entry_bytes (about 300 bytes each
+            in 3D), by default None (only bounded by max_entries)
+        """
+        assert max_entries > 0 and (max_bytes is None or max_bytes > 0)
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        # the estimated memory of the cached entries
+        self.nbytes: int = 0
+        self.tolerance: float = tolerance
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._cache: OrderedDict = OrderedDict()
+        self._owner = None
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hit_rate(self) -> float:
+        """the fraction of lookups answered by the cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def bind(self, owner):
+        """the method to bind the cache to the map whose results it holds
+
+        Parameters
+        ----------
+        owner : MapSpace
+            the map using the cache
+
+        Raises
+        ------
+        ValueError
+            The variable [edge_cache] is already bound to another map.
+        """
+        if self._owner is not None and self._owner is not owner:
+            raise ValueError(
+                "The variable [edge_cache] must be invalid. Please check this variable!"
+            )
+        self._owner = owner
+
+    def key(self, start: NDArray[Any], end: NDArray[Any], *args) -> Hashable:
+        """the method to make the direction-insensitive key of a segment
+
+        Parameters
+        ----------
+        start : NDArray[Any]
+            the coordination of one end of the segment
+        end : NDArray[Any]
+            the coordination of the other end of the segment
+        args : Hashable
+            the other settings the result depends on, e.g. the number of sampled points
+
+        Returns
+        -------
+        Hashable
+            the key of the segment
+        """
+        start_key = array_key(start, self.tolerance)
+        end_key = array_key(end, self.tolerance)
+        if end_key < start_key:
+            start_key, end_key = end_key, start_key
+
+        return (start_key, end_key, *args)
+
+    def get(self, key: Hashable) -> Optional[bool]:
+        """the method to look up the result of a segment and count the hit or miss
+
+        Parameters
+        ----------
+        key : Hashable
+            the key of the segment
+
+        Returns
+        -------
+        Optional[bool]
+            the cached result, None if the segment is not cached
+        """
+        ret = self._cache.get(key)
+        if ret is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+
+        return ret
+
+    def put(self, key: Hashable, collision_free: bool):
+        """the method to store the result of a segment, evicting the least recently used one when full
+
+        Parameters
+        ----------
+        key : Hashable
+            the key of the segment
+        collision_free : bool
+            whether the segment is feasible
+        """
+        if key not in self._cache:
+            self.nbytes += entry_bytes(key)
+        self._cache[key] = bool(collision_free)
+        self._cache.move_to_end(key)
+        # the latest entry is kept even if it alone is over the byte bound
+        while len(self._cache) > 1 and (
+            len(self._cache) > self.max_entries
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            evicted, _ = self._cache.popitem(last=False)
+            self.nbytes -= entry_bytes(evicted)
+
+    def clear(self):
+        """the method to drop all the cached results and reset the counters"""
+        self._cache.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
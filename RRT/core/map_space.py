@@ -1,16 +1,33 @@
-import math
-from typing import Any, List
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, List, Tuple
 
 import numpy as np
-from nptyping import NDArray
+from RRT.core.edge_cache import EdgeCache
 from RRT.core.route_info import RouteInfo
 from RRT.core.sign import MapType
-from RRT.util.comb import combination_from_candidates
 from RRT.util.path_smooth import path_smooth_with_bspline, path_smooth_with_line
+from RRT.util.traversal import voxel_traversal
+
+if TYPE_CHECKING:
+    from nptyping import NDArray
 
 
 class MapSpace:
-    def __init__(self, map: List[str], sample_level: str = "continues"):
+    """the map of the mission, stored as a compact occupancy grid
+
+    The cells are kept as a uint8 grid, or only as a bit-packed wall mask (1 bit per cell) when bit_packed is set.
+    The coordinations of the origin and the target are extracted once and kept separately.
+    """
+
+    def __init__(
+        self,
+        map: List[str],
+        sample_level: str = "continues",
+        collision_mode: str = "sample",
+        edge_cache: EdgeCache = None,
+        bit_packed: bool = False,
+    ):
         """the initial method for MapSpace
 
         Parameters
@@ -19,26 +36,145 @@ class MapSpace:
             the array of map. 0 stands for empty, 1 stands for origin, 2 stands for target, 3 stands for wall.
         sample_level : str
             sample level for algorithm. Only to "discrete", "continues", by default 'continues'
+        collision_mode : str
+            how a straight segment is checked. Only to "sample" (check fill_num points on it), "traversal" (check
+            exactly the cells it passes through) or "pyramid" (the same result as "traversal", walking through the
+            blocks of a max-pooled occupancy pyramid first and only descending into the blocks mixing walls and empty
+            cells), by default 'sample'
+        edge_cache : EdgeCache
+            the cache of the results of straight segments checked by collision_free, segment_free and segments_free,
+            bound to this map and not to be given to another one, by default None (no cache)
+        bit_packed : bool
+            whether to keep only the bit-packed wall mask instead of the uint8 grid, by default False
 
         Raises
         ------
         ValueError
-            The variable [map] or [sample_level] is invalid.
+            The variable [map], [sample_level], [collision_mode] or [edge_cache] is invalid.
         """
-        self.map: NDArray[(Any, ...)] = np.array(map)
-
-        self.min_border: NDArray[Any] = np.zeros(self.map.ndim, dtype=np.int32) - 0.5
-        self.max_border: NDArray[Any] = (
-            np.ones(self.map.ndim, dtype=np.int32) * self.map.shape
-        ) - 0.5
+        # the grid is built as uint8 at once, never through an array of wider cells, and a uint8 array (e.g. a
+        # memory-mapped one) is used as it is without copy. An object array or a ragged list leaves no grid
+        self._grid: NDArray[(Any, ...)] = None
+        if getattr(map, "dtype", None) != object:
+            try:
+                self._grid = np.asarray(map, dtype=np.uint8)
+            except (TypeError, ValueError):
+                pass
 
         self.sample_level: str = sample_level
-
+        self.collision_mode: str = collision_mode
         if not self._is_valid():
             raise ValueError(
-                "The variable [map] or [sample_level] must be invalid. Please check these variables!"
+                "The variable [map], [sample_level] or [collision_mode] must be invalid. Please check these variables!"
             )
 
+        self.shape: Tuple[int, ...] = self._grid.shape
+        self.ndim: int = self._grid.ndim
+
+        self.min_border: NDArray[Any] = np.zeros(self.ndim, dtype=np.int32) - 0.5
+        self.max_border: NDArray[Any] = (
+            np.ones(self.ndim, dtype=np.int32) * self.shape
+        ) - 0.5
+
+        if edge_cache is not None:
+            edge_cache.bind(self)
+        self.edge_cache: EdgeCache = edge_cache
+        # the number of segments checked against the walls so far, the cache hits excluded
+        self.collision_checks: int = 0
+
+        # the (2^ndim, ndim) choices between the lower and upper candidate cell of each dimension
+        self._corner_choices: NDArray[(Any, Any)] = (
+            np.indices((2,) * self.ndim).reshape(self.ndim, -1).T.astype(bool)
+        )
+
+        self.origin: NDArray[Any] = np.array(
+            np.nonzero(self._grid == MapType.ORIGIN)
+        ).reshape([-1])
+        self.target: NDArray[Any] = np.array(
+            np.nonzero(self._grid == MapType.TARGET)
+        ).reshape([-1])
+
+        self._wall_bits: NDArray[Any] = None
+        if bit_packed:
+            self._wall_bits = np.packbits(self._grid == MapType.WALL, axis=None)
+            self._grid = None
+
+        self._free_cells: NDArray[Any] = None
+        self._pyramid: List[Tuple[NDArray[(Any, ...)], NDArray[(Any, ...)]]] = None
+        if self.collision_mode == "pyramid":
+            self._pyramid = self._build_pyramid()
+
+    def to_grid(self) -> NDArray[(Any, ...)]:
+        """the instance method to get the uint8 grid of the map
+
+        The grid is kept as it is unless bit_packed is set, then a new grid is allocated and rebuilt from the wall mask
+        on every call. wall_mask and is_wall are the way to check the walls, which never build the whole grid.
+
+        Returns
+        -------
+        NDArray[(Any, ...)]
+            the uint8 array of map, with the same cells as the given one
+        """
+        if self._grid is not None:
+            return self._grid
+
+        atlas = self.wall_mask().astype(np.uint8) * np.uint8(MapType.WALL)
+        if self.origin.shape[0] > 0:
+            atlas[tuple(self.origin)] = MapType.ORIGIN
+        if self.target.shape[0] > 0:
+            atlas[tuple(self.target)] = MapType.TARGET
+        return atlas
+
+    def wall_mask(self) -> NDArray[(Any, ...)]:
+        """the instance method to get the boolean mask of the wall cells
+
+        Returns
+        -------
+        NDArray[(Any, ...)]
+            the boolean array with the shape of the map, True for the wall cells
+        """
+        if self._grid is not None:
+            return self._grid == MapType.WALL
+
+        size = int(np.prod(self.shape))
+        return np.unpackbits(self._wall_bits, count=size).reshape(self.shape).view(bool)
+
+    def free_cells(self) -> NDArray[Any]:
+        """the instance method to get the flat indices of the cells that are not wall, computed once and cached
+
+        Returns
+        -------
+        NDArray[Any]
+            the flat indices (in the C order of the map) of the free cells in ascending order
+        """
+        if self._free_cells is None:
+            self._free_cells = np.flatnonzero(~self.wall_mask())
+
+        return self._free_cells
+
+    def is_wall(self, cells: Tuple[Any, ...]) -> NDArray[Any]:
+        """the instance method to check whether the cells are walls
+
+        Parameters
+        ----------
+        cells : Tuple[Any, ...]
+            the index of each dimension of the cells, as in numpy fancy indexing (negative indices wrap around)
+
+        Returns
+        -------
+        NDArray[Any]
+            whether each cell is wall
+        """
+        if self._grid is not None:
+            return self._grid[cells] == MapType.WALL
+
+        cells = tuple(
+            np.where(np.asarray(idx) < 0, np.asarray(idx) + size, idx)
+            for idx, size in zip(cells, self.shape)
+        )
+        flat = np.ravel_multi_index(cells, self.shape)
+        return ((self._wall_bits[flat >> 3] >> (7 - (flat & 7))) & 1).astype(bool)
+
     def _is_valid(self) -> bool:
         """the private method to check whether the given map info is valid
 
@@ -48,15 +184,48 @@ class MapSpace:
             the result of whether the given map info is valid
         """
         # if map is not a array or tensor but object
-        if self.map.dtype == "O":
+        if self._grid is None:
             return False
 
         # if sample level is invalid
         if self.sample_level != "discrete" and self.sample_level != "continues":
             return False
 
+        # if collision mode is invalid
+        if self.collision_mode not in ("sample", "traversal", "pyramid"):
+            return False
+
         return True
 
+    def _build_pyramid(self) -> List[Tuple[NDArray[(Any, ...)], NDArray[(Any, ...)]]]:
+        """the private method to build the max-pooled occupancy pyramid of the wall mask
+
+        The level i (from 0) is made of the blocks of 2^(i+1) cells per dimension, and it keeps whether any cell and
+        whether every cell of each block is wall. The cells out of the map padded into the last blocks are not walls.
+        The levels are halved until a single block covers the whole map.
+
+        Returns
+        -------
+        List[Tuple[NDArray[(Any, ...)], NDArray[(Any, ...)]]]
+            the (any wall, all wall) boolean arrays of each level, from fine to coarse
+        """
+        any_wall = all_wall = self.wall_mask()
+        axes = tuple(range(1, 2 * self.ndim, 2))
+
+        levels = []
+        while max(any_wall.shape) > 1:
+            pad_width = [(0, size % 2) for size in any_wall.shape]
+            any_wall = np.pad(any_wall, pad_width)
+            all_wall = np.pad(all_wall, pad_width)
+
+            # split each dimension into (blocks, 2) and pool over the pairs
+            shape = [num for size in any_wall.shape for num in (size // 2, 2)]
+            any_wall = any_wall.reshape(shape).any(axis=axes)
+            all_wall = all_wall.reshape(shape).all(axis=axes)
+            levels.append((any_wall, all_wall))
+
+        return levels
+
     # [ ] consider the safe distance between drone and wall
     def collision_free(
         self, route_info: RouteInfo, fill_num: int = 30, method="None"
@@ -68,26 +237,60 @@ class MapSpace:
         route_info : RouteInfo
             the route information from algorithm
         fill_num : int
-            the number of line points to be filled in route
+            the number of line points to be filled in route, unused in "traversal" and "pyramid" collision mode
+        method : str
+            "None" to check the straight route, otherwise the route smoothed with B-spline is checked by sampling
 
         Returns
         -------
         bool
             whether the route solution is feasible
         """
-        coordination: NDArray[Any] = route_info.get_route()
+        return self.polyline_free(route_info.get_route(), fill_num, method)
+
+    def polyline_free(
+        self, coordination: NDArray[(Any, Any)], fill_num: int = 30, method="None"
+    ) -> bool:
+        """the instance method to determine whether the route given as an array of points is feasible
+
+        Parameters
+        ----------
+        coordination : NDArray[(Any, Any)]
+            the (n, ndim) coordinations of the points of the route in order
+        fill_num : int
+            the number of line points to be filled in route, unused in "traversal" and "pyramid" collision mode
+        method : str
+            "None" to check the straight route, otherwise the route smoothed with B-spline is checked by sampling
+
+        Returns
+        -------
+        bool
+            whether the route is feasible
+        """
+        coordination = np.asarray(coordination)
         _, ndim = coordination.shape
 
         # coord-pair's dimension must be equal to map's
-        assert ndim == self.map.ndim
+        assert ndim == self.ndim
 
-        for coord in coordination:
-            for dim in range(ndim):
-                if coord[dim] < self.min_border[dim]:
-                    return False
-                if coord[dim] > self.max_border[dim]:
-                    return False
+        if np.any(coordination < self.min_border) or np.any(
+            coordination > self.max_border
+        ):
+            return False
+
+        if coordination.shape[0] == 1:
+            return self.check_point_feasible(coordination)
 
+        if method == "None" and (
+            self.collision_mode != "sample" or self.edge_cache is not None
+        ):
+            # checking the route segment by segment is the same as checking the filled line points as a whole
+            return all(
+                self._cached_segment_free(coordination[i], coordination[i + 1], fill_num)
+                for i in range(coordination.shape[0] - 1)
+            )
+
+        self.collision_checks += coordination.shape[0] - 1
         # complete the detailed route filing with line points
         if method == "None":
             new_coordination = path_smooth_with_line(coordination, fill_num=fill_num)
@@ -97,8 +300,268 @@ class MapSpace:
         # check the feasibility
         return self.check_point_feasible(new_coordination, *new_coordination.shape)
 
+    def segment_free(
+        self, start: NDArray[Any], end: NDArray[Any], fill_num: int = 30
+    ) -> bool:
+        """the instance method to determine whether the straight segment between two points is feasible
+
+        It gives the same result as collision_free on the two-point route without building any route or node.
+
+        Parameters
+        ----------
+        start : NDArray[Any]
+            the coordination of the start of the segment
+        end : NDArray[Any]
+            the coordination of the end of the segment
+        fill_num : int
+            the number of line points to be filled in the segment, unused in "traversal" and "pyramid" collision mode
+
+        Returns
+        -------
+        bool
+            whether the segment is feasible
+        """
+        start = np.asarray(start, dtype=np.float64)
+        end = np.asarray(end, dtype=np.float64)
+
+        if (
+            np.any(start < self.min_border)
+            or np.any(start > self.max_border)
+            or np.any(end < self.min_border)
+            or np.any(end > self.max_border)
+        ):
+            return False
+
+        return self._cached_segment_free(start, end, fill_num)
+
+    def _cached_segment_free(
+        self, start: NDArray[Any], end: NDArray[Any], fill_num: int
+    ) -> bool:
+        """the private method to check a segment inside the borders, through the edge cache if there is one
+
+        Parameters
+        ----------
+        start : NDArray[Any]
+            the coordination of the start of the segment
+        end : NDArray[Any]
+            the coordination of the end of the segment
+        fill_num : int
+            the number of line points to be filled in the segment, unused in "traversal" and "pyramid" collision mode
+
+        Returns
+        -------
+        bool
+            whether the segment is feasible
+        """
+        if self.edge_cache is not None:
+            key = self.edge_cache.key(start, end, fill_num)
+            ret = self.edge_cache.get(key)
+            if ret is not None:
+                return ret
+
+        self.collision_checks += 1
+        if self.collision_mode == "traversal":
+            ret = self._segment_free_by_traversal(start, end)
+        elif self.collision_mode == "pyramid":
+            ret = self._segment_free_by_pyramid(start, end, len(self._pyramid), 0, 1)
+        else:
+            ret = not self.points_touch_wall(np.linspace(start, end, num=fill_num)).any()
+
+        if self.edge_cache is not None:
+            self.edge_cache.put(key, ret)
+
+        return ret
+
+    def segments_free(
+        self,
+        starts: NDArray[(Any, Any)],
+        ends: NDArray[(Any, Any)],
+        fill_num: int = 30,
+    ) -> NDArray[Any]:
+        """the instance method to determine whether each straight segment is feasible
+
+        It gives the same result as collision_free on the two-point route of each segment, and in "sample" collision
+        mode all the segments are checked in one vectorized pass.
+
+        Parameters
+        ----------
+        starts : NDArray[(Any, Any)]
+            the (k, ndim) coordinations of the starts of the segments
+        ends : NDArray[(Any, Any)]
+            the (k, ndim) coordinations of the ends of the segments
+        fill_num : int
+            the number of line points to be filled in each segment, unused in "traversal" and "pyramid" collision mode
+
+        Returns
+        -------
+        NDArray[Any]
+            the (k,) boolean array of whether each segment is feasible
+        """
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        assert starts.shape == ends.shape and starts.shape[-1] == self.ndim
+
+        ret = np.all(
+            (starts >= self.min_border)
+            & (starts <= self.max_border)
+            & (ends >= self.min_border)
+            & (ends <= self.max_border),
+            axis=1,
+        )
+        idx = np.flatnonzero(ret)
+
+        if self.edge_cache is not None:
+            keys, missing = {}, []
+            for i in idx:
+                keys[i] = self.edge_cache.key(starts[i], ends[i], fill_num)
+                cached = self.edge_cache.get(keys[i])
+                if cached is None:
+                    missing.append(i)
+                else:
+                    ret[i] = cached
+            # only the segments missing from the cache are checked below
+            idx = np.array(missing, dtype=np.intp)
+
+        if idx.shape[0] == 0:
+            return ret
+
+        self.collision_checks += idx.shape[0]
+        if self.collision_mode == "traversal":
+            for i in idx:
+                ret[i] = self._segment_free_by_traversal(starts[i], ends[i])
+        elif self.collision_mode == "pyramid":
+            for i in idx:
+                ret[i] = self._segment_free_by_pyramid(
+                    starts[i], ends[i], len(self._pyramid), 0, 1
+                )
+        else:
+            points = np.linspace(starts[idx], ends[idx], num=fill_num, axis=1)
+            ret[idx] = ~self.points_touch_wall(points).any(axis=1)
+
+        if self.edge_cache is not None:
+            for i in idx:
+                self.edge_cache.put(keys[i], ret[i])
+
+        return ret
+
+    def _segment_free_by_traversal(
+        self, start: NDArray[Any], end: NDArray[Any]
+    ) -> bool:
+        """the private method to check a segment exactly by walking through the cells it touches
+
+        Parameters
+        ----------
+        start : NDArray[Any]
+            the coordination of the start of the segment
+        end : NDArray[Any]
+            the coordination of the end of the segment
+
+        Returns
+        -------
+        bool
+            whether no cell touched by the segment is wall
+        """
+        shape = self.shape
+        for cell in voxel_traversal(start, end):
+            # the cells out of the map are not walls
+            if any(not 0 <= idx < size for idx, size in zip(cell, shape)):
+                continue
+            if self.is_wall(cell):
+                return False
+
+        return True
+
+    def _segment_free_by_pyramid(
+        self,
+        start: NDArray[Any],
+        end: NDArray[Any],
+        level: int,
+        t_start: float,
+        t_end: float,
+        parent: Tuple[int, ...] = None,
+        eps: float = 1e-9,
+    ) -> bool:
+        """the private method to check a part of a segment by walking through the blocks of the occupancy pyramid
+
+        In the coordination x' = (x + 0.5) / 2^level - 0.5, the block b of the level spans [b - 0.5, b + 0.5] like a
+        cell, so the blocks touched by the segment are found by voxel_traversal. The empty blocks are skipped, a full
+        block rejects the segment at once, and only the part of the segment inside a mixed block is walked through at
+        the finer level.
+
+        Parameters
+        ----------
+        start : NDArray[Any]
+            the coordination of the start of the whole segment
+        end : NDArray[Any]
+            the coordination of the end of the whole segment
+        level : int
+            the level to walk through, 0 stands for the cells and i for the blocks of 2^i cells per dimension
+        t_start : float
+            the parameter of the start of the part to check, 0 stands for start and 1 stands for end
+        t_end : float
+            the parameter of the end of the part to check
+        parent : Tuple[int, ...], optional
+            the block of the coarser level containing the part, only its sub-blocks are checked, by default None
+        eps : float, optional
+            the tolerance in the segment parameter when clipping the segment to a block, by default 1e-9
+
+        Returns
+        -------
+        bool
+            whether no cell touched by the part of the segment is wall
+        """
+        delta = end - start
+        scale = 2 ** level
+        shape = self.shape if level == 0 else self._pyramid[level - 1][0].shape
+        if parent is None:
+            lower, upper = (0,) * self.ndim, shape
+        else:
+            # the neighbors of the parent touching the part on its boundary are checked by their own parents
+            lower = [2 * idx for idx in parent]
+            upper = [min(2 * idx + 2, size) for idx, size in zip(parent, shape)]
+
+        visited = set()
+        for block in voxel_traversal(
+            (start + t_start * delta + 0.5) / scale - 0.5,
+            (start + t_end * delta + 0.5) / scale - 0.5,
+        ):
+            if block in visited or any(
+                not low <= idx < high for idx, low, high in zip(block, lower, upper)
+            ):
+                continue
+            visited.add(block)
+
+            if level == 0:
+                if self.is_wall(block):
+                    return False
+                continue
+
+            any_wall, all_wall = self._pyramid[level - 1]
+            if not any_wall[block]:
+                continue
+            if all_wall[block]:
+                return False
+
+            # clip the segment to the closed box of the block
+            low = np.array(block) * scale - 0.5
+            high = low + scale
+            t_low, t_high = 0.0, 1.0
+            for dim in np.flatnonzero(delta):
+                t_a = (low[dim] - start[dim]) / delta[dim]
+                t_b = (high[dim] - start[dim]) / delta[dim]
+                t_low = max(t_low, min(t_a, t_b) - eps)
+                t_high = min(t_high, max(t_a, t_b) + eps)
+            if t_low > t_high:
+                continue
+            if not self._segment_free_by_pyramid(
+                start, end, level - 1, t_low, t_high, block, eps
+            ):
+                return False
+
+        return True
+
     def check_point_feasible(
-        self, coordination: NDArray[Any], node_num: int, ndim: int
+        self, coordination: NDArray[Any], node_num: int = None, ndim: int = None
     ) -> bool:
         """the instance method to check whether the point is feasible
 
@@ -106,41 +569,51 @@ class MapSpace:
         ----------
         coordination : NDArray[Any]
             the route coordination from route info
-        node_num : int
-            the number of node of the given route from route info
-        ndim : int
-            the number of dimension
+        node_num : int, optional
+            the number of node of the given route from route info, by default all the rows
+        ndim : int, optional
+            the number of dimension, by default the number of dimension of the map
 
         Returns
         -------
         bool
             whether each point in route is feasible
         """
-        combs = []
-        for nodeID in range(node_num):
-            coord_pair = coordination[nodeID]
-            candidates = [set() for _ in range(ndim)]
+        if node_num is not None:
+            coordination = coordination[:node_num]
 
-            for dim in range(ndim):
-                coord = coord_pair[dim]
+        return not np.any(self.points_touch_wall(coordination))
 
-                ceil_coord = math.ceil(coord)
-                floor_coord = math.floor(coord)
+    def points_touch_wall(self, coordination: NDArray[(Any, Any)]) -> NDArray[Any]:
+        """the instance method to check whether each point touches a wall cell
 
-                if coord - floor_coord > 0.5:
-                    candidates[dim].add(ceil_coord)
-                elif coord - floor_coord < 0.5:
-                    candidates[dim].add(floor_coord)
-                else:
-                    candidates[dim].add(ceil_coord)
-                    candidates[dim].add(floor_coord)
+        Each cell spans half a unit around its integer coordination and its boundary belongs to the cell, so a point
+        lying exactly on the boundary between cells touches all of them.
 
-            # check whether each possible position is wall (because even the boundary of wall is infeasible)
-            combinations = combination_from_candidates(
-                candidates, converter=lambda x: tuple(x)
-            )
-            combs.extend(combinations)
+        Parameters
+        ----------
+        coordination : NDArray[(Any, Any)]
+            the coordinations of the points, with the last axis as the dimension
+
+        Returns
+        -------
+        NDArray[Any]
+            whether each point touches a wall, with the shape of coordination except the last axis
+        """
+        coordination = np.asarray(coordination, dtype=np.float64)
+
+        floor_coord = np.floor(coordination)
+        frac = coordination - floor_coord
+        low = np.where(frac > 0.5, floor_coord + 1, floor_coord).astype(np.intp)
+        high = np.where(frac < 0.5, floor_coord, floor_coord + 1).astype(np.intp)
 
-        return not any(
-            map(lambda comb: self.map[tuple(map(int, comb))] == MapType.WALL, combs)
+        if np.array_equal(low, high):
+            return self.is_wall(tuple(np.moveaxis(low, -1, 0)))
+
+        # expand the points lying on the cell boundary to every adjacent cell
+        cells = np.where(
+            self._corner_choices, high[..., np.newaxis, :], low[..., np.newaxis, :]
         )
+        walls = self.is_wall(tuple(np.moveaxis(cells, -1, 0)))
+
+        return walls.any(axis=-1)
@@ -1,37 +1,59 @@
-from typing import Any
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
-from nptyping import NDArray
 from RRT.core.map_space import MapSpace
 
+if TYPE_CHECKING:
+    from nptyping import NDArray
+
 
 class MissionInfo:
-    def __init__(self, map_info: MapSpace):
+    def __init__(
+        self,
+        map_info: MapSpace,
+        origin: NDArray[Any] = None,
+        target: NDArray[Any] = None,
+    ):
+        """the initial method for MissionInfo
+
+        Parameters
+        ----------
+        map_info : MapSpace
+            the map information
+        origin : NDArray[Any], optional
+            the coordination of the origin, by default None (the origin marked in the map)
+        target : NDArray[Any], optional
+            the coordination of the target, by default None (the target marked in the map)
+        """
         self.map_info: MapSpace = map_info
+        self._origin: NDArray[Any] = None if origin is None else np.asarray(origin)
+        self._target: NDArray[Any] = None if target is None else np.asarray(target)
 
         self.origin = self.extract_origin_info()
         self.target = self.extract_target_info()
 
     def extract_origin_info(self) -> NDArray[Any]:
-        """the instance method to extract the origin infomation/coordination from the given map info
+        """the instance method to extract the origin infomation/coordination, the given one or the one in the map info
 
         Returns
         -------
         NDArray[Any]
             the origin infomation/coordination
         """
-        coord = np.nonzero(self.map_info.map == 1)
-        origin = np.array(coord).reshape([-1])
-        return origin
+        if self._origin is not None:
+            return self._origin
+        return self.map_info.origin
 
     def extract_target_info(self) -> NDArray[Any]:
-        """the instance method to extract the target infomation/coordination from the given map info
+        """the instance method to extract the target infomation/coordination, the given one or the one in the map info
 
         Returns
         -------
         NDArray[Any]
             the target information/coordination
         """
-        coord = np.nonzero(self.map_info.map == 2)
-        target = np.array(coord).reshape([-1])
-        return target
+        if self._target is not None:
+            return self._target
+        return self.map_info.target
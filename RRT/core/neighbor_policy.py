@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Any, List, Tuple
+
+import numpy as np
+from RRT.core.map_space import MapSpace
+from RRT.core.tree import Tree, TreeNode
+
+if TYPE_CHECKING:
+    from nptyping import NDArray
+
+
+class NeighborPolicy:
+    """the rule of which nodes RRT* considers as the neighbors of a new node for choose-parent and rewire
+
+    "fixed" takes the neighbor_num nearest nodes whatever the size of the tree. "radius" takes the nodes within
+    r(n) = min(gamma * (log n / n)^(1/d), max_radius) and "knn" takes the k(n) = ceil(k_rrt * log n) nearest nodes, with
+    n the number of nodes in the tree and d the number of dimension. Both keep RRT* asymptotically optimal while the
+    expected number of neighbors only grows as log n.
+    """
+
+    def __init__(
+        self,
+        map_info: MapSpace,
+        policy: str = "fixed",
+        neighbor_num: int = 5,
+        gamma: float = None,
+        k_rrt: float = None,
+        max_radius: float = np.inf,
+    ):
+        """the initial method for NeighborPolicy
+
+        Parameters
+        ----------
+        map_info : MapSpace
+            the map information, for the number of dimension and the volume of the free space
+        policy : str, optional
+            the rule of the neighbors. Only to "fixed", "radius" or "knn", by default 'fixed'
+        neighbor_num : int, optional
+            the number of neighbors of the "fixed" rule, by default 5
+        gamma : float, optional
+            the constant of the "radius" rule, by default 1.1 times the lower bound
+            (2 * (1 + 1/d))^(1/d) * (free volume / unit ball volume)^(1/d) of Karaman & Frazzoli, left None for the
+            other rules
+        k_rrt : float, optional
+            the constant of the "knn" rule, by default 1.1 times the lower bound e * (1 + 1/d)
+        max_radius : float, optional
+            the max radius of the "radius" rule, usually the step size, by default np.inf
+
+        Raises
+        ------
+        ValueError
+            The variable [policy] is invalid.
+        """
+        if policy not in ("fixed", "radius", "knn"):
+            raise ValueError(
+                "The variable [policy] must be invalid. Please check this variable!"
+            )
+
+        ndim = map_info.ndim
+        self.policy: str = policy
+        self.neighbor_num: int = neighbor_num
+        self.max_radius: float = max_radius
+
+        # the free volume is only counted for the rule using it, without listing the free cells
+        if gamma is None and policy == "radius":
+            free_volume = np.count_nonzero(~map_info.wall_mask())
+            unit_ball_volume = math.pi ** (ndim / 2) / math.gamma(ndim / 2 + 1)
+            gamma = 1.1 * (
+                2 * (1 + 1 / ndim) * free_volume / unit_ball_volume
+            ) ** (1 / ndim)
+        self.gamma: float = gamma
+        self.k_rrt: float = 1.1 * math.e * (1 + 1 / ndim) if k_rrt is None else k_rrt
+        self.ndim: int = ndim
+
+    def radius(self, num: int) -> float:
+        """the instance method to get the radius of the "radius" rule
+
+        Parameters
+        ----------
+        num : int
+            the number of nodes in the tree
+
+        Returns
+        -------
+        float
+            the radius
+        """
+        num = max(num, 2)
+        return min(
+            self.gamma * (math.log(num) / num) ** (1 / self.ndim), self.max_radius
+        )
+
+    def neighbor_count(self, num: int) -> int:
+        """the instance method to get the number of neighbors of the "fixed" or "knn" rule
+
+        Parameters
+        ----------
+        num : int
+            the number of nodes in the tree
+
+        Returns
+        -------
+        int
+            the number of neighbors
+        """
+        if self.policy == "fixed":
+            return self.neighbor_num
+        return max(math.ceil(self.k_rrt * math.log(max(num, 1))), 1)
+
+    def query(
+        self, tree: Tree, coord: NDArray[Any], nearest: TreeNode = None
+    ) -> Tuple[List[TreeNode], NDArray[Any]]:
+        """the instance method to get the neighbors of a coordination in the tree
+
+        Parameters
+        ----------
+        tree : Tree
+            the tree to search
+        coord : NDArray[Any]
+            the coordination of the new node
+        nearest : TreeNode, optional
+            the node always included in the neighbors, e.g. the node the new node is steered from, by default None
+
+        Returns
+        -------
+        Tuple[List[TreeNode], NDArray[Any]]
+            the neighbors and their distances, in ascending order of distance
+        """
+        if self.policy == "radius":
+            neighbors, dists = tree.get_neighbors_within(coord, self.radius(len(tree)))
+        else:
+            neighbors, dists = tree.get_nearest_neighbors(
+                coord, self.neighbor_count(len(tree))
+            )
+
+        if nearest is not None and all(node.index != nearest.index for node in neighbors):
+            neighbors = neighbors + [nearest]
+            dists = np.append(dists, np.linalg.norm(nearest.coord - coord))
+
+        return neighbors, dists
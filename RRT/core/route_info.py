@@ -1,10 +1,14 @@
-from typing import Any, List, Union
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, List, Union
 
 import numpy as np
-from nptyping import NDArray
 from RRT.util.distcalc import dist_calc
 from RRT.core.tree_node import TreeNode
 
+if TYPE_CHECKING:
+    from nptyping import NDArray
+
 
 class RouteInfo:
     def __init__(
@@ -26,6 +30,27 @@ class RouteInfo:
         self._coords: List[Any] = list(map(lambda node: node.coord, nodes))
         self._length: np.float64 = length
 
+    @classmethod
+    def from_coords(cls, coords: NDArray[(Any, Any)], length: np.float64 = 0):
+        """the method to create the route directly from the coordinations of its points
+
+        Parameters
+        ----------
+        coords : NDArray[(Any, Any)]
+            the coordinations of the points in order
+        length : np.float64
+            the length of the route
+
+        Returns
+        -------
+        RouteInfo
+            the route information
+        """
+        route_info = cls([], length)
+        route_info._coords = list(coords)
+
+        return route_info
+
     def append(self, node: TreeNode):
         self._length += dist_calc(self._coords[-1], node.coord)
         self._coords.append(node.coord)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, List, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from nptyping import NDArray
+    from scipy.spatial import cKDTree
+
+
+def select_nearest(
+    idx: NDArray[Any], dist: NDArray[Any], k: int
+) -> Tuple[NDArray[Any], NDArray[Any]]:
+    """the function to select the k nearest candidates, ordered by distance and then by index
+
+    Parameters
+    ----------
+    idx : NDArray[Any]
+        the indices of the candidates
+    dist : NDArray[Any]
+        the distances of the candidates
+    k : int
+        the number of candidates to keep
+
+    Returns
+    -------
+    Tuple[NDArray[Any], NDArray[Any]]
+        the indices and distances of the k nearest candidates
+    """
+    if k < dist.shape[0]:
+        # keep every candidate tied with the k-th one, so that the order does not depend on the partition
+        kth_dist = np.partition(dist, k - 1)[k - 1]
+        mask = dist <= kth_dist
+        idx, dist = idx[mask], dist[mask]
+    order = np.lexsort((idx, dist))[:k]
+
+    return idx[order], dist[order]
+
+
+class SpatialIndex(ABC):
+    """the interface of the nearest-neighbor index over the coordinations of tree nodes
+
+    The coordinations are owned by the tree and handed to the index as an (n, ndim) array whose rows are only
+    appended. All the returned indices are row numbers of that array.
+    """
+
+    @abstractmethod
+    def update(self, points: NDArray[(Any, Any)]):
+        """the method to make the index cover all the rows of the given coordinations
+
+        Parameters
+        ----------
+        points : NDArray[(Any, Any)]
+            the coordinations of all the nodes in the tree
+        """
+        pass
+
+    @abstractmethod
+    def query(
+        self, points: NDArray[(Any, Any)], coord: NDArray[Any], k: int
+    ) -> Tuple[NDArray[Any], NDArray[Any]]:
+        """the method to find the k nearest nodes of the given coordination
+
+        Parameters
+        ----------
+        points : NDArray[(Any, Any)]
+            the coordinations of all the nodes in the tree
+        coord : NDArray[Any]
+            the coordination to search around
+        k : int
+            the number of neighbors, no more than the number of nodes
+
+        Returns
+        -------
+        Tuple[NDArray[Any], NDArray[Any]]
+            the indices and distances of the neighbors, in ascending order of distance
+        """
+        pass
+
+    @abstractmethod
+    def query_radius(
+        self, points: NDArray[(Any, Any)], coord: NDArray[Any], radius: float
+    ) -> Tuple[NDArray[Any], NDArray[Any]]:
+        """the method to find all the nodes within the radius of the given coordination
+
+        Parameters
+        ----------
+        points : NDArray[(Any, Any)]
+            the coordinations of all the nodes in the tree
+        coord : NDArray[Any]
+            the coordination to search around
+        radius : float
+            the search radius (inclusive)
+
+        Returns
+        -------
+        Tuple[NDArray[Any], NDArray[Any]]
+            the indices and distances of the neighbors, in ascending order of distance
+        """
+        pass
+
+    def clear(self):
+        """the method to drop everything indexed so far, used when the rows of the tree are rearranged"""
+        pass
+
+
+class BruteForceIndex(SpatialIndex):
+    """the index scanning every node with one vectorized distance computation"""
+
+    def update(self, points: NDArray[(Any, Any)]):
+        pass
+
+    def query(
+        self, points: NDArray[(Any, Any)], coord: NDArray[Any], k: int
+    ) -> Tuple[NDArray[Any], NDArray[Any]]:
+        dist = np.linalg.norm(points - coord, axis=1)
+        return select_nearest(np.arange(points.shape[0]), dist, k)
+
+    def query_radius(
+        self, points: NDArray[(Any, Any)], coord: NDArray[Any], radius: float
+    ) -> Tuple[NDArray[Any], NDArray[Any]]:
+        dist = np.linalg.norm(points - coord, axis=1)
+        idx = np.flatnonzero(dist <= radius)
+        return select_nearest(idx, dist[idx], idx.shape[0])
+
+
+class KDTreeIndex(SpatialIndex):
+    """the incrementally maintained kd-tree index
+
+    The nodes are split into contiguous blocks of leaf_size * 2^i rows, each with its own static kd-tree, plus a
+    small tail of unindexed rows scanned directly. Whenever the two last blocks reach the same size they are merged
+    and rebuilt (the logarithmic method), so the index stays balanced while the tree grows and both insertion and
+    query costs are polylogarithmic.
+    """
+
+    def __init__(self, leaf_size: int = 64):
+        """the initial method for KDTreeIndex
+
+        Parameters
+        ----------
+        leaf_size : int, optional
+            the number of rows scanned directly before being indexed, also the size of the smallest block, by default 64
+        """
+        assert leaf_size > 0
+        self.leaf_size: int = leaf_size
+        self._blocks: List[Tuple[int, int, cKDTree]] = []
+        self._indexed: int = 0
+
+    def update(self, points: NDArray[(Any, Any)]):
+        while points.shape[0] - self._indexed >= self.leaf_size:
+            # scipy is only imported once the first block is built
+            from scipy.spatial import cKDTree
+
+            start, end = self._indexed, self._indexed + self.leaf_size
+            # merge the blocks with the same size to keep the number of blocks logarithmic
+            while self._blocks and (
+                self._blocks[-1][1] - self._blocks[-1][0] == end - start
+            ):
+                start = self._blocks.pop()[0]
+            self._blocks.append((start, end, cKDTree(points[start:end])))
+            self._indexed = end
+
+    def query(
+        self, points: NDArray[(Any, Any)], coord: NDArray[Any], k: int
+    ) -> Tuple[NDArray[Any], NDArray[Any]]:
+        candidates = [np.arange(self._indexed, points.shape[0])]
+        results = []
+        for start, end, kdtree in self._blocks:
+            block_dist, idx = kdtree.query(coord, k=min(k, end - start))
+            results.append((np.atleast_1d(block_dist), np.atleast_1d(idx) + start))
+            candidates.append(results[-1][1])
+        idx = np.concatenate(candidates)
+
+        # recompute the distances in the same way as the brute force
+        dist = np.linalg.norm(points[idx] - coord, axis=1)
+        if k < dist.shape[0] and results:
+            # a full block may have dropped nodes tied with the k-th distance, collect all of them
+            kth_dist = np.partition(dist, k - 1)[k - 1] * (1 + 1e-9) + 1e-12
+            for (start, _, kdtree), (block_dist, _) in zip(self._blocks, results):
+                if block_dist.shape[0] == k and block_dist[-1] <= kth_dist:
+                    candidates.append(
+                        np.array(kdtree.query_ball_point(coord, kth_dist), dtype=np.intp) + start
+                    )
+            idx = np.unique(np.concatenate(candidates))
+            dist = np.linalg.norm(points[idx] - coord, axis=1)
+
+        return select_nearest(idx, dist, k)
+
+    def query_radius(
+        self, points: NDArray[(Any, Any)], coord: NDArray[Any], radius: float
+    ) -> Tuple[NDArray[Any], NDArray[Any]]:
+        candidates = [np.arange(self._indexed, points.shape[0])]
+        for start, _, kdtree in self._blocks:
+            # search a little wider and filter below, so that the border cases agree with the brute force
+            idx = kdtree.query_ball_point(coord, radius * (1 + 1e-9) + 1e-12)
+            candidates.append(np.array(idx, dtype=np.intp) + start)
+        idx = np.concatenate(candidates)
+
+        dist = np.linalg.norm(points[idx] - coord, axis=1)
+        mask = dist <= radius
+        return select_nearest(idx[mask], dist[mask], np.count_nonzero(mask))
+
+    def clear(self):
+        self._blocks = []
+        self._indexed = 0
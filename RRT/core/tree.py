@@ -1,62 +1,407 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from typing import List
 
 import numpy as np
 from RRT.core.route_info import RouteInfo
+from RRT.core.spatial_index import KDTreeIndex, SpatialIndex
 from RRT.core.tree_node import TreeNode
-from RRT.util import dist_calc
+from RRT.util import array_key, dist_calc
+
+
+class TreeNodes(Sequence):
+    """the read-only sequence of the nodes in a tree, creating node views on demand
+
+    The nodes are indexed by their rows in the arrays of the tree, so the rows of the removed nodes are included.
+    """
+
+    def __init__(self, tree: Tree):
+        self._tree = tree
+
+    def __len__(self) -> int:
+        return self._tree._size
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("tree node index out of range")
+        return TreeNode.view(self._tree, idx)
+
+    def __contains__(self, node) -> bool:
+        return isinstance(node, TreeNode) and self._tree.find(node.coord) >= 0
+
+    def index(self, node: TreeNode) -> int:
+        idx = self._tree.find(node.coord)
+        if idx < 0:
+            raise ValueError("the node is not in the tree")
+        return idx
 
 
 class Tree:
-    def __init__(self, origin_coord):
-        self.root = TreeNode(origin_coord)
-        self.nodes = [self.root]
+    """the search tree stored as struct of arrays
+
+    The coordinations, parent indices and costs of the nodes live in contiguous arrays grown by doubling, and the
+    nodes handed out are views of their rows (see TreeNode). The root is always the node 0 and its parent index is -1.
+    The children of each node are kept as a doubly linked list in the arrays of the first child and the next and
+    previous siblings, so a subtree can be walked without scanning the whole tree. A dict keyed by the (quantized)
+    coordinations maps each node to its index for constant-time lookup. Each node also records whether the edge to
+    its parent is known to be collision-free, for the planners checking the edges lazily.
+
+    A removed node keeps its row as a tombstone, unlinked from its parent and dropped from the lookup, and is skipped
+    by the neighbor queries, so the indices of the other nodes never change.
+    """
+
+    def __init__(
+        self,
+        origin_coord,
+        spatial_index: SpatialIndex = None,
+        capacity: int = 16,
+        tolerance: float = 0,
+    ):
+        """the initial method for Tree
+
+        Parameters
+        ----------
+        origin_coord : NDArray[Any]
+            the coordination of the root
+        spatial_index : SpatialIndex, optional
+            the nearest-neighbor index of the nodes, by default a KDTreeIndex
+        capacity : int, optional
+            the number of nodes allocated in advance, by default 16
+        tolerance : float, optional
+            the quantization size for the node lookup, the coordinations quantized to the same cell are regarded as the
+            same node, by default 0 (exact match)
+        """
+        capacity = max(capacity, 1)
+        self._coords = np.empty((capacity, np.size(origin_coord)), dtype=np.float64)
+        self._parents = np.empty(capacity, dtype=np.intp)
+        self._costs = np.empty(capacity, dtype=np.float64)
+        self._first_child = np.empty(capacity, dtype=np.intp)
+        self._next_sibling = np.empty(capacity, dtype=np.intp)
+        self._prev_sibling = np.empty(capacity, dtype=np.intp)
+        self._checked = np.empty(capacity, dtype=bool)
+        self._removed = np.empty(capacity, dtype=bool)
+        self._size = 0
+        self._removed_num = 0
+        self.tolerance: float = tolerance
+        self._lookup = {}
+
+        self.spatial_index: SpatialIndex = (
+            KDTreeIndex() if spatial_index is None else spatial_index
+        )
+        self._append(origin_coord, -1, 0)
+
+    def __len__(self) -> int:
+        """the number of nodes in the tree, the removed nodes excluded"""
+        return self._size - self._removed_num
+
+    @property
+    def root(self) -> TreeNode:
+        return TreeNode.view(self, 0)
+
+    @property
+    def nodes(self) -> TreeNodes:
+        return TreeNodes(self)
+
+    @property
+    def coords(self):
+        """the (n, ndim) coordinations of the nodes, a view that is invalidated when the tree grows"""
+        return self._coords[: self._size]
+
+    @property
+    def parents(self):
+        """the parent index of each node, a view that is invalidated when the tree grows"""
+        return self._parents[: self._size]
+
+    @property
+    def costs(self):
+        """the cost of each node, a view that is invalidated when the tree grows"""
+        return self._costs[: self._size]
+
+    @property
+    def checked(self):
+        """whether the edge from each node to its parent is known to be collision-free, a view that is invalidated
+        when the tree grows"""
+        return self._checked[: self._size]
+
+    @property
+    def removed(self):
+        """whether each row is the tombstone of a removed node, a view that is invalidated when the tree grows"""
+        return self._removed[: self._size]
+
+    def _append(self, coord, parent_idx: int, cost, checked: bool = True) -> int:
+        if self._size == self._coords.shape[0]:
+            self._coords = np.concatenate((self._coords, np.empty_like(self._coords)))
+            self._parents = np.concatenate((self._parents, np.empty_like(self._parents)))
+            self._costs = np.concatenate((self._costs, np.empty_like(self._costs)))
+            self._first_child = np.concatenate(
+                (self._first_child, np.empty_like(self._first_child))
+            )
+            self._next_sibling = np.concatenate(
+                (self._next_sibling, np.empty_like(self._next_sibling))
+            )
+            self._prev_sibling = np.concatenate(
+                (self._prev_sibling, np.empty_like(self._prev_sibling))
+            )
+            self._checked = np.concatenate((self._checked, np.empty_like(self._checked)))
+            self._removed = np.concatenate((self._removed, np.empty_like(self._removed)))
+
+        idx = self._size
+        self._coords[idx] = coord
+        self._parents[idx] = -1
+        self._costs[idx] = cost
+        self._first_child[idx] = -1
+        self._next_sibling[idx] = -1
+        self._prev_sibling[idx] = -1
+        self._checked[idx] = checked
+        self._removed[idx] = False
+        self._size += 1
+        self.set_parent(idx, parent_idx)
+        self._lookup[array_key(coord, self.tolerance)] = idx
+        self.spatial_index.update(self.coords)
+
+        return idx
+
+    def set_parent(self, idx: int, parent_idx: int):
+        """the method to link a node to a new parent, moving it between the child lists without touching the costs
+
+        Parameters
+        ----------
+        idx : int
+            the index of the node
+        parent_idx : int
+            the index of the new parent, -1 to detach the node
+        """
+        old_parent = self._parents[idx]
+        if old_parent >= 0:
+            prev_sibling, next_sibling = self._prev_sibling[idx], self._next_sibling[idx]
+            if prev_sibling >= 0:
+                self._next_sibling[prev_sibling] = next_sibling
+            else:
+                self._first_child[old_parent] = next_sibling
+            if next_sibling >= 0:
+                self._prev_sibling[next_sibling] = prev_sibling
+
+        self._parents[idx] = parent_idx
+        self._prev_sibling[idx] = -1
+        self._next_sibling[idx] = -1
+        if parent_idx >= 0:
+            first_child = self._first_child[parent_idx]
+            self._next_sibling[idx] = first_child
+            if first_child >= 0:
+                self._prev_sibling[first_child] = idx
+            self._first_child[parent_idx] = idx
+
+    def children(self, idx: int) -> List[int]:
+        """the method to get the children of a node
+
+        Parameters
+        ----------
+        idx : int
+            the index of the node
+
+        Returns
+        -------
+        List[int]
+            the indices of the children, the latest linked first
+        """
+        ret = []
+        child = self._first_child[idx]
+        while child >= 0:
+            ret.append(int(child))
+            child = self._next_sibling[child]
+        return ret
+
+    def subtree(self, idx: int) -> List[int]:
+        """the method to get all the nodes of the subtree rooted at a node, walked iteratively
+
+        Parameters
+        ----------
+        idx : int
+            the index of the root of the subtree
+
+        Returns
+        -------
+        List[int]
+            the indices of the nodes in the subtree, in depth-first order starting with the root
+        """
+        first_child, next_sibling = self._first_child, self._next_sibling
+        ret = []
+        stack = [idx]
+        while stack:
+            node = stack.pop()
+            ret.append(node)
+            child = first_child[node]
+            while child >= 0:
+                stack.append(int(child))
+                child = next_sibling[child]
+        return ret
+
+    def rewire(self, node: TreeNode, parent: TreeNode):
+        """the method to change the parent of a node and update the costs of its whole subtree
+
+        The cost of the node becomes the cost through the new parent, and the same change is pushed down to every
+        descendant, so the costs stay correct without recalculating the whole tree. The new parent must not be in the
+        subtree of the node, and the new edge must be collision-free.
+
+        Parameters
+        ----------
+        node : TreeNode
+            the node to rewire
+        parent : TreeNode
+            the new parent
+        """
+        assert node.tree is self and parent.tree is self
+        idx = node.index
+        cost = self._costs[parent.index] + dist_calc(
+            self._coords[parent.index], self._coords[idx]
+        )
+        delta = cost - self._costs[idx]
+
+        self.set_parent(idx, parent.index)
+        self._checked[idx] = True
+        if delta != 0:
+            self._costs[self.subtree(idx)] += delta
+
+    def remove_subtree(self, idx: int) -> List[int]:
+        """the method to remove the subtree rooted at a node
+
+        The subtree is unlinked from its parent and its nodes are left as tombstones, so the cost is only in the size
+        of the subtree and the indices and node views of the other nodes stay valid.
+
+        Parameters
+        ----------
+        idx : int
+            the index of the root of the subtree, not the root of the tree
+
+        Returns
+        -------
+        List[int]
+            the indices of the removed nodes
+        """
+        assert 0 < idx < self._size and not self._removed[idx]
+        ret = self.subtree(idx)
+        self.set_parent(idx, -1)
+        self._removed[ret] = True
+        self._removed_num += len(ret)
+        for node in ret:
+            del self._lookup[array_key(self._coords[node], self.tolerance)]
+
+        return ret
+
+    def find(self, coord) -> int:
+        """the method to find the node with the given coordination
+
+        Parameters
+        ----------
+        coord : NDArray[Any]
+            the coordination of the node
+
+        Returns
+        -------
+        int
+            the index of the node, -1 if there is no such node
+        """
+        return self._lookup.get(array_key(coord, self.tolerance), -1)
 
     def get_node(self, node: TreeNode) -> TreeNode:
         assert self.is_reach(node)
 
-        return self.nodes[self.nodes.index(node)]
-
-    def add_node(self, coord, parent):
-        dist = dist_calc(parent.coord, coord)
-        new_node = TreeNode(coord, parent.cost + dist, parent)
+        return TreeNode.view(self, self.find(node.coord))
 
-        if new_node in self.nodes:
-            node = self.nodes[self.nodes.index(new_node)]
-            return node
+    def add_node(self, coord, parent, checked: bool = True):
+        idx = self.find(coord)
+        if idx >= 0:
+            return TreeNode.view(self, idx)
 
-        self.nodes.append(new_node)
+        assert parent._tree is self
+        dist = dist_calc(parent.coord, coord)
+        idx = self._append(coord, parent.index, parent.cost + dist, checked)
 
-        return new_node
+        return TreeNode.view(self, idx)
 
     def get_route(self, end_node: TreeNode) -> RouteInfo:
-        route = [end_node]
-        cost = end_node.cost
-
-        while route[-1].parent != None:
-            route.append(route[-1].parent)
+        route = []
+        idx = end_node.index
+        while idx >= 0:
+            route.append(idx)
+            idx = self._parents[idx]
         route.reverse()
-        ret = RouteInfo(route, cost)
+        ret = RouteInfo.from_coords(self._coords[route], end_node.cost)
 
         return ret
 
     def get_nearest_neighbors(self, coord, n=1) -> List[TreeNode]:
-        n = n if 0 < n <= len(self.nodes) else len(self.nodes)
+        n = n if 0 < n <= len(self) else len(self)
+        coord = np.asarray(coord, dtype=np.float64)
 
-        ret = []
-        for node in self.nodes:
-            dist = dist_calc(node.coord, coord)
-            ret.append(dist)
-        idx = np.argpartition(np.array(ret), n - 1)
+        # the tombstones are still indexed, so more neighbors are asked for in proportion to them, and again until
+        # enough of them are left
+        k = -(-n * self._size // len(self))
+        while True:
+            idx, dist = self.spatial_index.query(self.coords, coord, min(k, self._size))
+            if self._removed_num:
+                alive = ~self._removed[idx]
+                idx, dist = idx[alive][:n], dist[alive][:n]
+            if idx.shape[0] == n:
+                break
+            k *= 2
 
-        return [self.nodes[idx[x]] for x in range(n)], np.array([ret[idx[x]] for x in range(n)])
+        return [TreeNode.view(self, int(x)) for x in idx], dist
+
+    def get_neighbors_within(self, coord, radius):
+        """the method to get all the nodes within the radius of the given coordination
+
+        Parameters
+        ----------
+        coord : NDArray[Any]
+            the coordination to search around
+        radius : float
+            the search radius (inclusive)
+
+        Returns
+        -------
+        Tuple[List[TreeNode], NDArray[Any]]
+            the neighbors and their distances, in ascending order of distance
+        """
+        idx, dist = self.spatial_index.query_radius(
+            self.coords, np.asarray(coord, dtype=np.float64), radius
+        )
+        if self._removed_num:
+            alive = ~self._removed[idx]
+            idx, dist = idx[alive], dist[alive]
+
+        return [TreeNode.view(self, int(x)) for x in idx], dist
 
     def update_cost(self):
-        for node in self.nodes:
-            node.cost = np.inf
-        for node in self.nodes:
-            node.update_cost()
+        """the method to recalculate the cost of every node from the parent indices
+
+        The costs are summed up along the parent links by pointer jumping, which takes log(depth) vectorized passes.
+        The costs of the removed nodes are meaningless.
+        """
+        parents = self.parents
+        has_parent = parents >= 0
+
+        costs = np.zeros(self._size)
+        costs[has_parent] = np.linalg.norm(
+            self.coords[has_parent] - self.coords[parents[has_parent]], axis=1
+        )
+        # costs[i] holds the length of the path from node i up to (excluding) the node jump[i]
+        jump = parents.copy()
+        for _ in range(self._size.bit_length() + 1):
+            active = np.flatnonzero(jump >= 0)
+            if active.shape[0] == 0:
+                break
+            costs[active] += costs[jump[active]]
+            jump[active] = jump[jump[active]]
+        else:
+            raise RuntimeError("the parent links of the tree contain a cycle")
+
+        self._costs[: self._size] = costs
 
     def is_reach(self, node: TreeNode):
         return node in self.nodes
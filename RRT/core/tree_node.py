@@ -5,11 +5,88 @@ import numpy as np
 
 
 class TreeNode:
+    """the node of the search tree
+
+    A node created directly is detached and keeps its own coordination, cost and parent. A node handed out by a Tree
+    is a lightweight view of one row of the tree's arrays, so reading or setting its attributes reads or writes the
+    tree itself.
+    """
+
+    __slots__ = ("_tree", "_idx", "_coord", "_cost", "_parent")
+
     def __init__(self, coord, cost=0, p: TreeNode = None):
-        self.coord = coord
-        self.real_dist = None
-        self.cost = cost
-        self.parent = p
+        self._tree = None
+        self._idx = -1
+        self._coord = coord
+        self._cost = cost
+        self._parent = p
+
+    @classmethod
+    def view(cls, tree, idx: int) -> TreeNode:
+        """the method to create the view of one node of the tree
+
+        Parameters
+        ----------
+        tree : Tree
+            the tree storing the node
+        idx : int
+            the index of the node in the tree
+
+        Returns
+        -------
+        TreeNode
+            the view of the node
+        """
+        node = cls.__new__(cls)
+        node._tree = tree
+        node._idx = idx
+        return node
+
+    @property
+    def index(self) -> int:
+        """the index of the node in its tree, -1 for a detached node"""
+        return self._idx
+
+    @property
+    def tree(self):
+        """the tree storing the node, None for a detached node"""
+        return self._tree
+
+    @property
+    def coord(self):
+        if self._tree is None:
+            return self._coord
+        return self._tree._coords[self._idx]
+
+    @property
+    def cost(self):
+        if self._tree is None:
+            return self._cost
+        return self._tree._costs[self._idx]
+
+    @cost.setter
+    def cost(self, cost):
+        if self._tree is None:
+            self._cost = cost
+        else:
+            self._tree._costs[self._idx] = cost
+
+    @property
+    def parent(self) -> TreeNode:
+        if self._tree is None:
+            return self._parent
+        parent_idx = self._tree._parents[self._idx]
+        return None if parent_idx < 0 else TreeNode.view(self._tree, int(parent_idx))
+
+    @parent.setter
+    def parent(self, node: TreeNode):
+        if self._tree is None:
+            self._parent = node
+        elif node is None:
+            self._tree.set_parent(self._idx, -1)
+        else:
+            assert node._tree is self._tree
+            self._tree.set_parent(self._idx, node._idx)
 
     def __eq__(self, other: TreeNode):
         if isinstance(other, TreeNode) and all(self.coord == other.coord):
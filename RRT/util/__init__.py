@@ -1,2 +1,2 @@
 from RRT.util.distcalc import dist_calc
-from RRT.util.arrayhash import array_hash
+from RRT.util.arrayhash import array_hash, array_key
@@ -1,7 +1,11 @@
-from typing import Any
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
-from nptyping import NDArray
+
+if TYPE_CHECKING:
+    from nptyping import NDArray
 
 
 def calc_unit_vector(
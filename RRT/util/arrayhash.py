@@ -1,3 +1,5 @@
+from typing import Hashable
+
 import numpy as np
 
 
@@ -15,3 +17,29 @@ def array_hash(array: np.ndarray) -> str:
         the result of the conversion
     """
     return str(array)
+
+
+def array_key(array: np.ndarray, tolerance: float = 0) -> Hashable:
+    """the method to convert a coordination to a hashable key for dict lookup
+
+    Unlike array_hash, the key is exact and does not depend on the print options. With a positive tolerance the
+    coordination is quantized to a grid of that size first, so the coordinations in the same grid cell share a key.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        the coordination to convert
+    tolerance : float, optional
+        the size of the quantization grid, by default 0 (no quantization)
+
+    Returns
+    -------
+    Hashable
+        the key of the coordination
+    """
+    array = np.asarray(array, dtype=np.float64)
+    if tolerance > 0:
+        array = np.round(array / tolerance)
+
+    # adding 0.0 turns -0.0 into 0.0, which is equal but has a different byte pattern
+    return (array + 0.0).tobytes()
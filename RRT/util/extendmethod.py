@@ -1,11 +1,15 @@
-from typing import Any
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
-from nptyping import NDArray
 from RRT.core import RRT as RRT
 from RRT.core.info import MapInfo
 from RRT.util.distcalc import dist_calc
 
+if TYPE_CHECKING:
+    from nptyping import NDArray
+
 
 def directly_extend(tree: RRT, new_node_info: NDArray[Any], nearest_node_ID: int):
     """the method to directly extend the tree from nearest node using new node
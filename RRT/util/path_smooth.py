@@ -1,8 +1,12 @@
-from typing import Any
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
-import scipy.interpolate as si
-from nptyping import NDArray
+
+if TYPE_CHECKING:
+    from nptyping import NDArray
+
 
 # reference: [https://stackoverflow.com/questions/34803197/fast-b-spline-algorithm-with-numpy-scipy]
 def bspline(cv, n=100, degree=3, periodic=False):
@@ -39,7 +43,9 @@ def bspline(cv, n=100, degree=3, periodic=False):
     # Calculate query range
     u = np.linspace(periodic, (count - degree), n)
 
-    # Calculate result
+    # Calculate result, with scipy only imported when a route is smoothed
+    import scipy.interpolate as si
+
     return np.array(si.splev(u, (kv, cv.T, degree))).T
 
 
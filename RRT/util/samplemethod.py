@@ -1,12 +1,16 @@
+from __future__ import annotations
+
 import math
 import random
-from typing import Any, List, Union
+from typing import TYPE_CHECKING, Any, List, Tuple, Union
 
 import numpy as np
-from nptyping import NDArray
 from RRT.util.angle import calc_unit_vector
 from RRT.util.distcalc import dist_calc
 
+if TYPE_CHECKING:
+    from nptyping import NDArray
+
 
 def random_sample(
     min_border: Union[List[float], np.ndarray],
@@ -40,6 +44,293 @@ def random_sample(
     return sample_coord
 
 
+class Sampler:
+    """the sampler of the points in a box and the goal-bias decisions, drawn in blocks from a seeded generator
+
+    The points and the uniform numbers for the decisions are drawn from a numpy.random.Generator a block at a time
+    and handed out one by one or as a batch, so the same seed gives the same sequence of samples.
+    """
+
+    def __init__(
+        self,
+        min_border: Union[List[float], np.ndarray],
+        max_border: Union[List[float], np.ndarray],
+        use_integer: bool = True,
+        seed: Union[int, np.random.Generator] = None,
+        block_size: int = 4096,
+    ):
+        """the initial method for Sampler
+
+        Parameters
+        ----------
+        min_border : Union[List[float], np.ndarray]
+            the list of min values of dimensions
+        max_border : Union[List[float], np.ndarray]
+            the list of max values of dimensions
+        use_integer : bool, optional
+            whether to sample the integer coordinations only, as random_sample, by default True
+        seed : Union[int, np.random.Generator], optional
+            the seed of the generator, or the generator itself, by default None (unpredictable)
+        block_size : int, optional
+            the number of points or decisions drawn at a time, by default 4096
+        """
+        assert block_size > 0
+        self.min_border: NDArray[Any] = np.asarray(min_border, dtype=np.float64)
+        self.max_border: NDArray[Any] = np.asarray(max_border, dtype=np.float64)
+        self.use_integer: bool = use_integer
+        self.block_size: int = block_size
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+
+        self._points: NDArray[(Any, Any)] = np.empty((0, self.min_border.shape[0]))
+        self._point_pos: int = 0
+        self._uniforms: List[float] = []
+        self._uniform_pos: int = 0
+
+    def _draw_points(self, num: int) -> NDArray[(Any, Any)]:
+        """the private method to draw a block of points from the generator
+
+        Parameters
+        ----------
+        num : int
+            the number of points
+
+        Returns
+        -------
+        NDArray[(Any, Any)]
+            the (num, ndim) sampled points
+        """
+        if self.use_integer:
+            return self.rng.integers(
+                np.ceil(self.min_border),
+                np.floor(self.max_border),
+                size=(num, self.min_border.shape[0]),
+                endpoint=True,
+            ).astype(np.float64)
+
+        return self.rng.uniform(
+            self.min_border, self.max_border, size=(num, self.min_border.shape[0])
+        )
+
+    def sample(self) -> NDArray[Any]:
+        """the instance method to get the next sampled point
+
+        Returns
+        -------
+        NDArray[Any]
+            the coordination of the point
+        """
+        if self._point_pos == self._points.shape[0]:
+            self._points = self._draw_points(self.block_size)
+            self._point_pos = 0
+
+        self._point_pos += 1
+        return self._points[self._point_pos - 1]
+
+    def sample_batch(self, num: int) -> NDArray[(Any, Any)]:
+        """the instance method to get the next sampled points, the same as calling sample num times
+
+        Parameters
+        ----------
+        num : int
+            the number of points
+
+        Returns
+        -------
+        NDArray[(Any, Any)]
+            the (num, ndim) coordinations of the points
+        """
+        ret = self._points[self._point_pos : self._point_pos + num]
+        self._point_pos += ret.shape[0]
+        if ret.shape[0] < num:
+            rest = num - ret.shape[0]
+            # drawing whole blocks keeps the generator in step with the single samples
+            self._points = self._draw_points(-(-rest // self.block_size) * self.block_size)
+            self._point_pos = rest
+            ret = np.concatenate((ret, self._points[:rest]))
+
+        return ret
+
+    def uniform(self) -> float:
+        """the instance method to get the next uniform number in [0, 1)
+
+        Returns
+        -------
+        float
+            the uniform number
+        """
+        if self._uniform_pos == len(self._uniforms):
+            self._uniforms = self.rng.random(self.block_size).tolist()
+            self._uniform_pos = 0
+
+        self._uniform_pos += 1
+        return self._uniforms[self._uniform_pos - 1]
+
+    def decide(self, prob: float) -> bool:
+        """the instance method to make a random decision
+
+        Parameters
+        ----------
+        prob : float
+            the probability of True
+
+        Returns
+        -------
+        bool
+            the decision
+        """
+        return self.uniform() < prob
+
+
+class FreeSpaceSampler(Sampler):
+    """the sampler of the points in the cells that are not wall
+
+    A cell is drawn uniformly from the given free cells, and without use_integer the point is jittered uniformly
+    inside the cell, so the points are uniform over the free space.
+    """
+
+    def __init__(
+        self,
+        free_cells: NDArray[Any],
+        shape: Tuple[int, ...],
+        use_integer: bool = True,
+        seed: Union[int, np.random.Generator] = None,
+        block_size: int = 4096,
+    ):
+        """the initial method for FreeSpaceSampler
+
+        Parameters
+        ----------
+        free_cells : NDArray[Any]
+            the flat indices of the free cells, as MapSpace.free_cells
+        shape : Tuple[int, ...]
+            the shape of the map
+        use_integer : bool, optional
+            whether to sample the centers of the cells only, by default True
+        seed : Union[int, np.random.Generator], optional
+            the seed of the generator, or the generator itself, by default None (unpredictable)
+        block_size : int, optional
+            the number of points or decisions drawn at a time, by default 4096
+        """
+        assert len(free_cells) > 0
+        super().__init__(
+            np.zeros(len(shape)) - 0.5,
+            np.array(shape) - 0.5,
+            use_integer=use_integer,
+            seed=seed,
+            block_size=block_size,
+        )
+        self.free_cells: NDArray[Any] = free_cells
+        self.shape: Tuple[int, ...] = tuple(shape)
+
+    def _draw_points(self, num: int) -> NDArray[(Any, Any)]:
+        cells = self.free_cells[self.rng.integers(len(self.free_cells), size=num)]
+        points = np.array(np.unravel_index(cells, self.shape), dtype=np.float64).T
+        if not self.use_integer:
+            points += self.rng.uniform(-0.5, 0.5, size=points.shape)
+
+        return points
+
+
+class InformedSampler:
+    """the sampler of the points that may shorten a route between the origin and the target (informed sampling)
+
+    The points whose distances to the origin and to the target sum to at most the cost c of the current route form
+    the prolate hyperspheroid with the two foci and the transverse diameter c. The points are drawn uniformly from it
+    by stretching and rotating the points drawn uniformly from the unit ball, which are drawn a block at a time and do
+    not depend on c.
+    """
+
+    def __init__(
+        self,
+        origin: NDArray[Any],
+        target: NDArray[Any],
+        min_border: Union[List[float], np.ndarray] = None,
+        max_border: Union[List[float], np.ndarray] = None,
+        seed: Union[int, np.random.Generator] = None,
+        block_size: int = 4096,
+    ):
+        """the initial method for InformedSampler
+
+        Parameters
+        ----------
+        origin : NDArray[Any]
+            the coordination of the origin
+        target : NDArray[Any]
+            the coordination of the target
+        min_border : Union[List[float], np.ndarray], optional
+            the list of min values of dimensions, the points out of the borders are rejected, by default None
+        max_border : Union[List[float], np.ndarray], optional
+            the list of max values of dimensions, by default None
+        seed : Union[int, np.random.Generator], optional
+            the seed of the generator, or the generator itself, by default None (unpredictable)
+        block_size : int, optional
+            the number of points drawn from the unit ball at a time, by default 4096
+        """
+        origin = np.asarray(origin, dtype=np.float64)
+        target = np.asarray(target, dtype=np.float64)
+        self.ndim: int = origin.shape[0]
+        self.center: NDArray[Any] = (origin + target) / 2
+        self.min_cost: float = float(np.linalg.norm(target - origin))
+        assert self.min_cost > 0
+        self.min_border: NDArray[Any] = min_border
+        self.max_border: NDArray[Any] = max_border
+        self.block_size: int = block_size
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+
+        # the rotation taking the first axis to the direction from the origin to the target
+        u, _, vt = np.linalg.svd(
+            np.outer((target - origin) / self.min_cost, np.eye(self.ndim)[0])
+        )
+        sign = np.ones(self.ndim)
+        sign[-1] = np.linalg.det(u) * np.linalg.det(vt)
+        self.rotation: NDArray[(Any, Any)] = u @ np.diag(sign) @ vt
+
+        self._balls: NDArray[(Any, Any)] = np.empty((0, self.ndim))
+        self._ball_pos: int = 0
+
+    def sample_unit_ball(self) -> NDArray[Any]:
+        """the instance method to get the next point drawn uniformly from the unit ball
+
+        Returns
+        -------
+        NDArray[Any]
+            the coordination of the point
+        """
+        if self._ball_pos == self._balls.shape[0]:
+            directions = self.rng.standard_normal((self.block_size, self.ndim))
+            directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+            radius = self.rng.random(self.block_size) ** (1 / self.ndim)
+            self._balls = directions * radius[:, np.newaxis]
+            self._ball_pos = 0
+
+        self._ball_pos += 1
+        return self._balls[self._ball_pos - 1]
+
+    def sample(self, cost: float) -> NDArray[Any]:
+        """the instance method to get the next point in the hyperspheroid of the given route cost
+
+        Parameters
+        ----------
+        cost : float
+            the cost of the current route, at least the distance between the origin and the target
+
+        Returns
+        -------
+        NDArray[Any]
+            the coordination of the point
+        """
+        radii = np.full(self.ndim, np.sqrt(max(cost**2 - self.min_cost**2, 0)) / 2)
+        radii[0] = cost / 2
+        transform = self.rotation * radii
+
+        while True:
+            point = transform @ self.sample_unit_ball() + self.center
+            if self.min_border is None or (
+                np.all(point >= self.min_border) and np.all(point <= self.max_border)
+            ):
+                return point
+
+
 def sample_unit_ball(num: int, dim: int = 3) -> List[np.ndarray]:
     """the method to get a number of points/nodes in a unit ball for given dimensions
 
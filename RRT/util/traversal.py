@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import itertools
+import math
+from typing import TYPE_CHECKING, Any, Iterator, Tuple
+
+if TYPE_CHECKING:
+    from nptyping import NDArray
+
+
+def voxel_traversal(
+    start: NDArray[Any], end: NDArray[Any], eps: float = 1e-9
+) -> Iterator[Tuple[int, ...]]:
+    """the method to enumerate the grid cells touched by a segment, in order from start to end
+
+    It is the Amanatides-Woo traversal on the grid whose cell i spans [i - 0.5, i + 0.5] in each dimension. As in
+    MapSpace.check_point_feasible, the boundary belongs to every adjacent cell: when the segment crosses several cell
+    boundaries at once (e.g. through a corner) or runs along a boundary, all the cells sharing it are yielded. Cells
+    may be yielded more than once and may lie outside the map.
+
+    Parameters
+    ----------
+    start : NDArray[Any]
+        the coordination of the start of the segment
+    end : NDArray[Any]
+        the coordination of the end of the segment
+    eps : float, optional
+        the tolerance in the segment parameter for simultaneous crossings, by default 1e-9
+
+    Yields
+    ------
+    Tuple[int, ...]
+        the index of each touched cell
+    """
+    start = [float(coord) for coord in start]
+    end = [float(coord) for coord in end]
+    ndim = len(start)
+
+    # the candidate indices of each dimension, fixed for the dimensions the segment does not move along
+    candidates = [None] * ndim
+    moving, steps, t_max = [], [], []
+    for dim in range(ndim):
+        delta = end[dim] - start[dim]
+        if delta > 0:
+            # the cell left behind when the first boundary is crossed, the boundary may be at the start itself
+            candidates[dim] = [math.ceil(start[dim] - 0.5)]
+            steps.append(1)
+        elif delta < 0:
+            candidates[dim] = [math.floor(start[dim] + 0.5)]
+            steps.append(-1)
+        else:
+            floor_coord = math.floor(start[dim])
+            frac = start[dim] - floor_coord
+            if frac > 0.5:
+                candidates[dim] = [floor_coord + 1]
+            elif frac < 0.5:
+                candidates[dim] = [floor_coord]
+            else:
+                candidates[dim] = [floor_coord, floor_coord + 1]
+            continue
+        moving.append(dim)
+        t_max.append((candidates[dim][0] + 0.5 * steps[-1] - start[dim]) / delta)
+
+    yield from itertools.product(*candidates)
+
+    while moving:
+        t = min(t_max)
+        if t > 1 + eps:
+            break
+        crossed = [i for i in range(len(moving)) if t_max[i] <= t + eps]
+
+        # every combination of the crossed dimensions touches the crossing point
+        for num in range(1, len(crossed) + 1):
+            for subset in itertools.combinations(crossed, num):
+                cell = list(candidates)
+                for i in subset:
+                    dim = moving[i]
+                    cell[dim] = [candidates[dim][0] + steps[i]]
+                yield from itertools.product(*cell)
+
+        for i in crossed:
+            dim = moving[i]
+            candidates[dim] = [candidates[dim][0] + steps[i]]
+            t_max[i] = (candidates[dim][0] + 0.5 * steps[i] - start[dim]) / (
+                end[dim] - start[dim]
+            )
@@ -1,19 +1,26 @@
-import logging
-from typing import Any
+from __future__ import annotations
 
-logging.getLogger("matplotlib").setLevel(logging.WARNING)
-logging.getLogger("PIL").setLevel(logging.WARNING)
+import logging
+from typing import TYPE_CHECKING
 
-import matplotlib.figure
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.patches import Patch
-from nptyping import NDArray
-from RRT.config import get_config
+from RRT.core.map_space import MapSpace
 from RRT.core.mission_info import MissionInfo
 from RRT.core.route_info import RouteInfo
 
-plt.set_loglevel("info")
+if TYPE_CHECKING:
+    import matplotlib.figure
+
+logging.getLogger("matplotlib").setLevel(logging.WARNING)
+logging.getLogger("PIL").setLevel(logging.WARNING)
+
+
+def _pyplot():
+    """the method to import pyplot, which is slow to import, only when a figure is drawn"""
+    import matplotlib.pyplot as plt
+
+    plt.set_loglevel("info")
+    return plt
 
 
 def visualize(
@@ -34,13 +41,12 @@ def visualize(
         the number of dimension must be 2 or 3!
     """
     # logger.debug(route_info.get_route('coord'))
-    config = get_config()
-    atlas = mission_info.map_info.map
-    ndim = atlas.ndim
+    map_info = mission_info.map_info
+    ndim = map_info.ndim
     if ndim == 2:
-        fig = visualize_2d(atlas, route_info)
+        fig = visualize_2d(map_info, route_info)
     elif ndim == 3:
-        fig = visualize_3d(atlas, route_info)
+        fig = visualize_3d(map_info, route_info)
     else:
         raise ValueError("the number of dimension must be 2 or 3!")
 
@@ -48,14 +54,14 @@ def visualize(
 
 
 def visualize_2d(
-    atlas: NDArray[Any], route_info: RouteInfo
+    map_info: MapSpace, route_info: RouteInfo
 ) -> matplotlib.figure.Figure:
     """the method to draw 2D figure
 
     Parameters
     ----------
-    atlas : NDArray[Any]
-        the map array
+    map_info : MapSpace
+        the map information
     route_info : RouteInfo
         the route info
 
@@ -64,11 +70,14 @@ def visualize_2d(
     matplotlib.figure.Figure
         the 2D figure
     """
+    plt = _pyplot()
+    from matplotlib.patches import Patch
+
     fig = plt.figure()
     ax = plt.gca()
     # add atlas info
     im = plt.imshow(
-        (atlas == 3).astype(int),
+        map_info.wall_mask().astype(int),
         interpolation="none",
         vmin=0,
         vmax=1,
@@ -81,12 +90,12 @@ def visualize_2d(
     route = plt.plot(coordination[:, 1], coordination[:, 0], color="C1")
 
     # add origin info
-    x, y = np.nonzero(atlas == 1)
+    x, y = map_info.origin
     origin = plt.Circle((y, x), 0.2, color="r")
     ax.add_patch(origin)
 
     # add target info
-    x, y = np.nonzero(atlas == 2)
+    x, y = map_info.target
     target = plt.Circle((y, x), 0.2, color="b")
     ax.add_patch(target)
 
@@ -111,13 +120,13 @@ def visualize_2d(
     return fig
 
 
-def visualize_3d(atlas: NDArray[Any], route_info: RouteInfo):
+def visualize_3d(map_info: MapSpace, route_info: RouteInfo):
     """the method to draw 3D figure
 
     Parameters
     ----------
-    atlas : NDArray[Any]
-        the map array
+    map_info : MapSpace
+        the map information
     route_info : RouteInfo
         the route info
 
@@ -126,6 +135,9 @@ def visualize_3d(atlas: NDArray[Any], route_info: RouteInfo):
     matplotlib.figure.Figure
         the 3D figure
     """
+    plt = _pyplot()
+    from matplotlib.patches import Patch
+
     fig = plt.figure()
     ax = plt.subplot(111, projection="3d")
 
@@ -140,24 +152,23 @@ def visualize_3d(atlas: NDArray[Any], route_info: RouteInfo):
     )
 
     # # add origin info
-    coord = np.nonzero(atlas == 1)
+    coord = map_info.origin
     origin = ax.scatter(coord[0], coord[1], coord[2], c="r", label="Origin")
 
     # # add target info
-    coord = np.nonzero(atlas == 2)
+    coord = map_info.target
     target = ax.scatter(coord[0], coord[1], coord[2], c="b", label="Target")
 
     # render the color of buildings
     wall_alpha = 1
     empty_alpha = 0
 
-    colors = np.empty(list(atlas.shape) + [4])
-    wall_x, wall_y, wall_z = np.nonzero(atlas == 3)
+    walls = map_info.wall_mask()
+    colors = np.empty(list(walls.shape) + [4])
     colors[:] = [0, 0, 0, empty_alpha]
-    for x, y, z in zip(wall_x, wall_y, wall_z):
-        colors[x, y, z] = [1, 1, 1, wall_alpha]
+    colors[walls] = [1, 1, 1, wall_alpha]
 
-    ax.voxels(atlas, facecolors=colors, label="Building")
+    ax.voxels(walls, facecolors=colors, label="Building")
 
     # add the legend of above things
     legend_handles = [
@@ -71,6 +71,7 @@ def get_alg(map_name, prob, step_size, max_attempts, *args, **kwargs):
         prob,
         step_size,
         max_attempts,
+        **kwargs,
     )
 
     return alg
@@ -51,7 +51,7 @@ def get_opt():
 ## Algorithm Running ##
 def get_alg(map_name, step_size, max_attempts, *args, **kwargs):
     mission_info = MissionInfo(MapSpace(map_loader.get_map(map_name)))
-    alg: BasicRRT = BasicRRT(None, mission_info, step_size, max_attempts)
+    alg: BasicRRT = BasicRRT(None, mission_info, step_size, max_attempts, **kwargs)
 
     return alg
 
@@ -1,6 +1,15 @@
+import time
+
+import numpy as np
 from loguru import logger
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import dijkstra
 from RRT.algorithm.basicRRT import BasicRRT
-from RRT.algorithm.a_star import A_Star
+from RRT.algorithm.batch import plan_missions
+from RRT.algorithm.a_star import A_Star, _cell_octile_distance, neighbor_offsets, octile_distance
+from RRT.algorithm.connect_RRT_star import Connect_RRT_Star
+from RRT.algorithm.jps import JPS, JumpTable
+from RRT.algorithm.parallel import Parallel_RRT
 from RRT.algorithm.RRT_with_probability import RRT_With_Probability
 from RRT.algorithm.RRT_connect import RRT_Connect
 from RRT.algorithm.RRT_star import RRT_Star
@@ -8,7 +17,7 @@ from RRT.config import map_loader
 from RRT.core.mission_info import MissionInfo
 from RRT.core.map_space import MapSpace
 from RRT.util.visualize import visualize
-from RRT.core.sign import Status
+from RRT.core.sign import MapType, Status
 
 def test_basic_A_Star_2d():
     mission_info = MissionInfo(MapSpace(map_loader.get_map("test_1")))
@@ -22,6 +31,237 @@ def test_basic_A_Star_2d():
         fig = visualize(mission_info, route_info)
         fig.savefig("./test_1.png")
 
+def test_A_Star_optimal():
+    rng = np.random.default_rng(0)
+    for shape in [(30, 25), (9, 8, 7)]:
+        for _ in range(5):
+            atlas = rng.choice([MapType.EMPTY, MapType.WALL], size=shape, p=[0.7, 0.3])
+            origin, target = rng.choice(np.flatnonzero(atlas == MapType.EMPTY), 2, replace=False)
+            atlas.flat[origin], atlas.flat[target] = MapType.ORIGIN, MapType.TARGET
+            mission_info = MissionInfo(MapSpace(atlas))
+
+            # the shortest path on the graph of every move between non-wall cells
+            free = atlas != MapType.WALL
+            offsets, move_costs = neighbor_offsets(len(shape))
+            rows, cols, weights = [], [], []
+            for offset, move_cost in zip(offsets, move_costs):
+                cells = np.argwhere(free)
+                neighbors = cells + offset
+                inside = np.all((neighbors >= 0) & (neighbors < shape), axis=1)
+                cells, neighbors = cells[inside], neighbors[inside]
+                reachable = free[tuple(neighbors.T)]
+                rows += list(np.ravel_multi_index(tuple(cells[reachable].T), shape))
+                cols += list(np.ravel_multi_index(tuple(neighbors[reachable].T), shape))
+                weights += [move_cost] * int(reachable.sum())
+            graph = coo_matrix((weights, (rows, cols)), shape=(atlas.size,) * 2).tocsr()
+            answer = dijkstra(graph, indices=origin)[target]
+
+            alg = A_Star(None, mission_info)
+            res = alg.run()
+            if np.isinf(answer):
+                assert res == Status.Failure
+                continue
+            assert res == Status.Success
+            route = alg.get_route().get_route()
+            assert np.isclose(alg.get_route().get_length(), answer)
+            assert np.isclose(np.linalg.norm(np.diff(route, axis=0), axis=1).sum(), answer)
+            assert np.all(np.abs(np.diff(route, axis=0)) <= 1)
+            assert np.all(free[tuple(route.T)])
+
+    # the heuristic calculated cell by cell in the search is octile_distance
+    shape = (11, 7, 5)
+    strides = np.cumprod((1,) + shape[:0:-1])[::-1]
+    target = np.array([3, 6, 1])
+    for idx in rng.integers(0, np.prod(shape), size=50).tolist():
+        coord = np.array(np.unravel_index(idx, shape))
+        assert np.isclose(
+            _cell_octile_distance(idx, strides.tolist(), target.tolist(), np.sqrt([1, 2, 3]).tolist()),
+            octile_distance(coord, target),
+        )
+
+
+def test_JPS_optimal():
+    rng = np.random.default_rng(1)
+    for shape in [(30, 25), (9, 8, 7)]:
+        # with no wall around, only the natural neighbors are left after pruning
+        jump_table = JumpTable(MapSpace(np.zeros((3,) * len(shape))))
+        center = jump_table.kinds[int(np.dot([2] * len(shape), jump_table.strides))]
+        for d, sub_directions in enumerate(jump_table.sub_directions):
+            natural = sum(1 << e for e in sub_directions + [d])
+            assert jump_table.successors[d][center] == natural
+
+        for block_prob in [0.1, 0.3]:
+            for _ in range(5):
+                atlas = rng.choice(
+                    [MapType.EMPTY, MapType.WALL], size=shape, p=[1 - block_prob, block_prob]
+                )
+                origin, target = rng.choice(np.flatnonzero(atlas == MapType.EMPTY), 2, replace=False)
+                atlas.flat[origin], atlas.flat[target] = MapType.ORIGIN, MapType.TARGET
+                mission_info = MissionInfo(MapSpace(atlas))
+
+                alg = A_Star(None, mission_info)
+                res = alg.run()
+                for jump_table in [False, True]:
+                    jps = JPS(None, mission_info, jump_table=jump_table)
+                    assert jps.run() == res
+                    if res != Status.Success:
+                        continue
+                    assert np.isclose(jps.get_route().get_length(), alg.get_route().get_length())
+                    route = jps.get_route().get_route()
+                    assert np.all(np.abs(np.diff(route, axis=0)) <= 1)
+                    assert np.all(atlas[tuple(route.T)] != MapType.WALL)
+
+
+def test_RRT_seed():
+    mission_info = MissionInfo(MapSpace(map_loader.get_map("test_1")))
+    routes = []
+    for _ in range(2):
+        alg = RRT_Star(None, mission_info, 0.7, 3, 5, 300, seed=42)
+        assert alg.run() == Status.Success
+        routes.append(alg.get_route().get_route())
+    assert np.all(routes[0] == routes[1])
+
+
+def test_budget():
+    # the target is walled in, so the search never ends without a budget
+    atlas = np.zeros((60, 60))
+    atlas[5, 5] = MapType.ORIGIN
+    atlas[49:52, 49:52] = MapType.WALL
+    atlas[50, 50] = MapType.TARGET
+    mission_info = MissionInfo(MapSpace(atlas))
+
+    for budget, reason in [
+        ({"time_budget": 0.5}, "time"),
+        ({"node_budget": 200}, "nodes"),
+        ({"collision_budget": 300}, "collisions"),
+    ]:
+        map_info = MapSpace(atlas)
+        alg = RRT_Star(None, MissionInfo(map_info), 0.7, 3, seed=0, **budget)
+        start = time.monotonic()
+        assert alg.run() == Status.Failure
+        assert alg.stop_reason == reason
+        assert time.monotonic() - start < 30
+        if reason == "nodes":
+            assert alg.tree_size() == 200
+        elif reason == "collisions":
+            # the last attempt starts below the budget and checks at most the neighbor_num + 1 edges to its neighbors
+            assert 300 <= map_info.collision_checks <= 300 + alg.neighbor_num
+
+    alg = A_Star(None, mission_info, time_budget=0)
+    assert alg.run() == Status.Failure
+    assert alg.stop_reason == "time"
+
+    # the best route found by the deadline is kept
+    mission_info = MissionInfo(MapSpace(map_loader.get_map("test_1")))
+    alg = RRT_Star(None, mission_info, 0.7, 3, 5, 10 ** 9, seed=0, time_budget=1)
+    assert alg.run() == Status.Success
+    assert alg.stop_reason == "time"
+    assert mission_info.map_info.collision_free(alg.get_route())
+
+
+def test_step():
+    mission_info = MissionInfo(MapSpace(map_loader.get_map("test_1")))
+    alg = RRT_Star(None, mission_info, 0.7, 3, 5, 300, seed=7)
+    assert alg.run() == Status.Success
+
+    # two planners interleaved by steps end as the planner run at once
+    algs = [RRT_Star(None, mission_info, 0.7, 3, 5, 300, seed=7) for _ in range(2)]
+    progresses = [[], []]
+    for pair in zip(*[other.steps(25) for other in algs]):
+        for progress, trace in zip(pair, progresses):
+            trace.append(progress)
+    for other, progress in zip(algs, progresses):
+        assert progress[-1].done and not any(p.done for p in progress[:-1])
+        assert progress[-1].attempts == alg.attempt_cnt
+        assert np.all(np.diff([p.tree_size for p in progress]) >= 0)
+        assert np.all(np.diff([p.best_cost for p in progress]) <= 0)
+        assert progress[-1].best_cost == alg.get_route().get_length()
+        assert np.all(other.get_route().get_route() == alg.get_route().get_route())
+
+    # a search paused by step is resumed by run
+    other = RRT_Star(None, mission_info, 0.7, 3, 5, 300, seed=7)
+    progress = other.step(10)
+    assert progress.attempts == 10 and not progress.done
+    assert other.run() == Status.Success
+    assert np.all(other.get_route().get_route() == alg.get_route().get_route())
+
+
+def test_parallel_RRT():
+    mission_info = MissionInfo(MapSpace(map_loader.get_map("test_1")))
+    alg = Parallel_RRT(RRT_Star, None, mission_info, 0.7, 3, 5, 200, num=4, max_workers=2, seed=0)
+    assert alg.run() == Status.Success
+    assert mission_info.map_info.collision_free(alg.get_route())
+
+    # the best of the copies is the best of the same planners run one by one
+    alg = Parallel_RRT(
+        RRT_Star, None, mission_info, 0.7, 3, 5, 200, num=3, max_workers=2, seed=0, policy="best"
+    )
+    assert alg.run() == Status.Success
+    assert len(alg.results) == 3
+    lengths = []
+    for seed in np.random.SeedSequence(0).spawn(3):
+        other = RRT_Star(None, mission_info, 0.7, 3, 5, 200, seed=np.random.default_rng(seed))
+        other.run()
+        lengths.append(other.get_route().get_length())
+    assert alg.get_route().get_length() == min(lengths)
+
+
+def test_plan_missions():
+    rng = np.random.default_rng(2)
+    atlas = rng.choice([MapType.EMPTY, MapType.WALL], size=(40, 30), p=[0.85, 0.15])
+    free = np.argwhere(atlas == MapType.EMPTY)
+    missions = [
+        {"id": i, "origin": free[o].tolist(), "target": free[t].tolist(), "seed": i}
+        for i, (o, t) in enumerate(rng.integers(len(free), size=(8, 2)))
+    ]
+    missions.append({"id": "wall", "origin": np.argwhere(atlas == MapType.WALL)[0].tolist(), "target": [0, 0]})
+
+    results = {ret["id"]: ret for ret in plan_missions(atlas, iter(missions), A_Star, max_workers=2)}
+    assert results.keys() == {mission["id"] for mission in missions}
+    assert results.pop("wall")["status"] == "Error"
+    map_info = MapSpace(atlas)
+    for mission in missions[:-1]:
+        alg = A_Star(None, MissionInfo(map_info, mission["origin"], mission["target"]))
+        ret = results[mission["id"]]
+        assert ret["status"] == alg.run().name
+        if ret["status"] == "Success":
+            assert np.isclose(ret["length"], alg.get_route().get_length())
+            assert ret["route"][0] == mission["origin"] and ret["route"][-1] == mission["target"]
+
+    for ret in plan_missions(atlas, missions[:-1], RRT_Star, 0.7, 3, max_workers=2, time_budget=5):
+        if ret["status"] == "Success":
+            assert map_info.polyline_free(np.array(ret["route"]))
+
+
+def test_lazy():
+    # the straight edges to the target cross the wall, so the lazy planners have to cut their trees
+    atlas = np.zeros((40, 40))
+    atlas[20, :32] = MapType.WALL
+    atlas[5, 5] = MapType.ORIGIN
+    atlas[35, 5] = MapType.TARGET
+    # each planner with the factor its lazy mode at least saves in collision checks, RRT_Connect saves about nothing
+    for make, saving in [
+        (lambda mission_info, **kwargs: BasicRRT(None, mission_info, 3, **kwargs), 2),
+        (lambda mission_info, **kwargs: RRT_With_Probability(None, mission_info, 0.7, 3, **kwargs), 2),
+        (lambda mission_info, **kwargs: RRT_Connect(None, mission_info, 0.7, 3, **kwargs), None),
+        (lambda mission_info, **kwargs: RRT_Star(None, mission_info, 0.7, 3, 5, 1000, **kwargs), 5),
+        (lambda mission_info, **kwargs: Connect_RRT_Star(None, mission_info, 0.7, 3, 5, 1000, **kwargs), 4),
+    ]:
+        checks = []
+        for lazy in (False, True):
+            mission_info = MissionInfo(MapSpace(atlas))
+            alg = make(mission_info, seed=1, lazy=lazy)
+            assert alg.run() == Status.Success
+            assert mission_info.map_info.collision_free(alg.get_route())
+            checks.append(mission_info.map_info.collision_checks)
+            for tree in alg.trees:
+                assert lazy or (tree.checked.all() and not tree.removed.any())
+                for idx in np.flatnonzero(~tree.removed):
+                    assert tree.find(tree.coords[idx]) == idx
+        if saving is not None:
+            assert checks[1] * saving < checks[0]
+
+
 def test_basic_RRT_2d():
     mission_info = MissionInfo(MapSpace(map_loader.get_map("test_1")))
     alg: BasicRRT = BasicRRT(None, mission_info, 3, 3000)
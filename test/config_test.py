@@ -1,4 +1,13 @@
+import os
+
+import numpy as np
+import pytest
+import yaml
 from RRT.config import get_config, get_map_config
+from RRT.config.map_info_loader import convert_map, read_map
+from RRT.config.map_registry import MapRegistry, map_hash
+from RRT.core.map_space import MapSpace
+from RRT.core.sign import MapType
 from loguru import logger
 
 
@@ -10,3 +19,77 @@ def test_get_config():
 def test_map_config():
     map_config = get_map_config()
     # logger.debug(map_config.container)
+
+
+def test_binary_map(tmp_path):
+    atlas = np.random.default_rng(0).choice([MapType.EMPTY, MapType.WALL], size=(30, 20, 4))
+    atlas[0, 0, 0], atlas[-1, -1, -1] = MapType.ORIGIN, MapType.TARGET
+    yaml_file = tmp_path / "binary.yaml"
+    with open(yaml_file, "w") as f:
+        yaml.dump({"MAP": atlas.tolist()}, f, default_flow_style=None)
+
+    npy_file = convert_map(str(yaml_file))
+    assert npy_file == str(tmp_path / "binary.npy")
+
+    binary_map = read_map(npy_file)
+    assert isinstance(binary_map, np.memmap) and binary_map.dtype == np.uint8
+    assert np.array_equal(binary_map, atlas)
+    yaml_map = read_map(str(yaml_file))
+    assert yaml_map.dtype == np.uint8 and np.array_equal(yaml_map, atlas)
+
+    map_info = MapSpace(binary_map)
+    assert np.array_equal(map_info.origin, [0, 0, 0])
+    assert np.array_equal(map_info.wall_mask(), atlas == MapType.WALL)
+
+
+def test_map_registry(tmp_path):
+    rng = np.random.default_rng(1)
+    atlases = {
+        name: rng.choice([MapType.EMPTY, MapType.WALL], size=(10 + i, 8)).astype(np.uint8)
+        for i, name in enumerate(["a", "b", "c"])
+    }
+    for name, atlas in atlases.items():
+        with open(tmp_path / f"{name}.yaml", "w") as f:
+            yaml.dump({"MAP": atlas.tolist()}, f, default_flow_style=None)
+    # the binary map is preferred to the YAML map of the same name
+    np.save(tmp_path / "c.npy", atlases["c"])
+    (tmp_path / "notes.txt").write_text("not a map")
+
+    registry = MapRegistry(str(tmp_path), max_bytes=2 * 11 * 8)
+    assert registry.names() == ["a", "b", "c"]
+    assert registry.manifest["c"]["path"] == "c.npy"
+    for name in ["a", "b", "c", "a"]:
+        atlas = registry.get_map(name)
+        assert np.array_equal(atlas, atlases[name]) and not atlas.flags.writeable
+    assert isinstance(registry.get_map("c"), np.memmap)
+    # the least recently used maps are evicted beyond the byte bound
+    assert list(registry._cache.keys()) == ["a", "c"]
+
+    manifest_file = registry.write_manifest()
+    registry = MapRegistry(str(tmp_path))
+    assert os.path.dirname(manifest_file) == str(tmp_path)
+    assert registry.manifest["b"]["shape"] == [11, 8]
+    assert registry.manifest["b"]["hash"] == map_hash(atlases["b"])
+    assert registry.manifest["c"]["hash"] == map_hash(atlases["c"])
+    assert np.array_equal(registry.get_map("b"), atlases["b"])
+
+    assert registry.manifest["c"]["size"] == os.path.getsize(tmp_path / "c.npy")
+
+    # a map changed after the manifest is written is not served, by its fingerprint without reading its cells
+    stat = os.stat(tmp_path / "c.npy")
+    np.save(tmp_path / "c.npy", atlases["c"][:-1])
+    with pytest.raises(ValueError):
+        MapRegistry(str(tmp_path)).get_map("c")
+    # the same size and mtime only pass the fingerprint, the hash is checked on demand
+    np.save(tmp_path / "c.npy", atlases["c"][::-1])
+    os.utime(tmp_path / "c.npy", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert np.array_equal(MapRegistry(str(tmp_path)).get_map("c"), atlases["c"][::-1])
+    with pytest.raises(ValueError):
+        MapRegistry(str(tmp_path), verify=True).get_map("c")
+    np.save(tmp_path / "c.npy", atlases["c"])
+    os.utime(tmp_path / "c.npy", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert np.array_equal(MapRegistry(str(tmp_path), verify=True).get_map("c"), atlases["c"])
+
+    # a map added after the manifest is still found
+    np.save(tmp_path / "d.npy", atlases["a"])
+    assert np.array_equal(registry.get_map("d"), atlases["a"])
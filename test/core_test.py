@@ -0,0 +1,367 @@
+import itertools
+
+import numpy as np
+import pytest
+from RRT.core.edge_cache import EdgeCache, entry_bytes
+from RRT.core.map_space import MapSpace
+from RRT.core.neighbor_policy import NeighborPolicy
+from RRT.core.route_info import RouteInfo
+from RRT.core.sign import MapType
+from RRT.core.spatial_index import BruteForceIndex, KDTreeIndex
+from RRT.core.tree import Tree, TreeNode
+from RRT.util.comb import combination_from_candidates
+from RRT.util.samplemethod import FreeSpaceSampler
+from RRT.util.traversal import voxel_traversal
+
+
+def test_kdtree_index():
+    rng = np.random.default_rng(0)
+    # integer coordinations make a lot of ties in distance
+    points = rng.integers(0, 20, size=(1000, 3)).astype(np.float64)
+    brute_force, kdtree = BruteForceIndex(), KDTreeIndex(leaf_size=8)
+    for n in range(1, points.shape[0] + 1, 37):
+        kdtree.update(points[:n])
+        for coord in rng.uniform(-1, 21, size=(5, 3)):
+            for k in [1, 5, n]:
+                k = min(k, n)
+                idx, dist = kdtree.query(points[:n], coord, k)
+                answer_idx, answer_dist = brute_force.query(points[:n], coord, k)
+                assert np.all(idx == answer_idx)
+                assert np.allclose(dist, answer_dist)
+
+            idx, _ = kdtree.query_radius(points[:n], coord, 4)
+            answer_idx, _ = brute_force.query_radius(points[:n], coord, 4)
+            assert np.all(idx == answer_idx)
+
+
+def test_tree_nearest_neighbors():
+    tree = Tree(np.array([0, 0]))
+    node = tree.root
+    for coord in [[1, 0], [2, 0], [2, 1], [0, 3]]:
+        node = tree.add_node(np.array(coord), node)
+
+    neighbors, dist = tree.get_nearest_neighbors(np.array([2.2, 0.4]), 2)
+    assert [list(node.coord) for node in neighbors] == [[2, 0], [2, 1]]
+    assert np.all(np.diff(dist) >= 0)
+
+    neighbors, dist = tree.get_neighbors_within(np.array([0, 0]), 2)
+    assert [list(node.coord) for node in neighbors] == [[0, 0], [1, 0], [2, 0]]
+
+
+def test_tree_struct_of_arrays():
+    tree = Tree(np.array([0, 0]), capacity=1)
+    first = tree.add_node(np.array([3, 4]), tree.root)
+    second = tree.add_node(np.array([3, 0]), first)
+    assert len(tree) == len(tree.nodes) == 3
+    assert second.parent == first and first.parent == tree.root
+    assert second.cost == 9
+
+    # views write through to the arrays of the tree
+    second.parent = tree.root
+    assert tree.parents[second.index] == 0
+    tree.update_cost()
+    assert np.allclose(tree.costs, [0, 5, 3])
+
+    route_info = tree.get_route(second)
+    assert np.all(route_info.get_route() == [[0, 0], [3, 0]])
+    assert route_info.get_length() == 3
+    assert tree.add_node(np.array([3, 4]), second) == first
+
+
+def test_tree_rewire():
+    rng = np.random.default_rng(10)
+    tree = Tree(np.array([0.0, 0.0]), capacity=4)
+    for coord in rng.uniform(0, 10, size=(300, 2)):
+        tree.add_node(coord, tree.nodes[int(rng.integers(len(tree)))])
+
+    for _ in range(300):
+        node, parent = tree.nodes[int(rng.integers(1, len(tree)))], tree.nodes[int(rng.integers(len(tree)))]
+        if parent.index in tree.subtree(node.index):
+            continue
+        tree.rewire(node, parent)
+        assert node.parent.index == parent.index
+
+    # the costs pushed down the subtrees match the costs recalculated from scratch
+    costs = tree.costs.copy()
+    tree.update_cost()
+    assert np.allclose(costs, tree.costs)
+    for idx in range(len(tree)):
+        assert sorted(tree.children(idx)) == list(np.flatnonzero(tree.parents == idx))
+    assert sorted(tree.subtree(0)) == list(range(len(tree)))
+
+
+def test_tree_lookup():
+    tree = Tree(np.array([0, 0]), tolerance=0.1)
+    node = tree.add_node(np.array([1.0, 1.0]), tree.root)
+    assert tree.find(np.array([1, 1])) == node.index
+    assert tree.find(np.array([1.02, 0.99])) == node.index
+    assert tree.find(np.array([1.5, 1])) == -1
+    assert tree.add_node(np.array([1.01, 1.0]), tree.root) == node
+    assert tree.is_reach(TreeNode(np.array([0.0, 0.0])))
+
+
+def test_tree_remove_subtree():
+    rng = np.random.default_rng(3)
+    tree = Tree(np.array([0.0, 0.0]), capacity=4)
+    for coord in rng.uniform(0, 10, size=(200, 2)):
+        tree.add_node(coord, tree.nodes[int(rng.integers(len(tree)))], checked=bool(rng.integers(2)))
+    coords, parents = tree.coords.copy(), tree.parents.copy()
+
+    removed = tree.remove_subtree(7)
+    assert len(set(removed)) == len(removed) and 7 in removed
+    assert len(tree) == 201 - len(removed)
+    alive = np.flatnonzero(~tree.removed)
+    # the other nodes keep their indices and parents
+    assert np.all(tree.coords == coords) and np.all(tree.parents[alive] == parents[alive])
+    assert 7 not in tree.children(parents[7])
+    assert sorted(tree.subtree(0)) == list(alive)
+    for idx in alive:
+        assert sorted(tree.children(idx)) == list(alive[tree.parents[alive] == idx])
+        assert tree.find(tree.coords[idx]) == idx
+    assert all(tree.find(coords[idx]) == -1 for idx in removed)
+
+    # the tombstones are skipped by the neighbor queries
+    for index in (KDTreeIndex(leaf_size=8), BruteForceIndex()):
+        other = Tree(coords[0], spatial_index=index)
+        for idx in alive[1:]:
+            other.add_node(coords[idx], other.nodes[0])
+        for coord in rng.uniform(0, 10, size=(20, 2)):
+            nodes, dist = tree.get_nearest_neighbors(coord, 5)
+            other_nodes, other_dist = other.get_nearest_neighbors(coord, 5)
+            assert np.allclose(dist, other_dist)
+            assert np.all([node.coord for node in nodes] == np.array([node.coord for node in other_nodes]))
+            nodes, _ = tree.get_neighbors_within(coord, 2)
+            assert not any(tree.removed[node.index] for node in nodes)
+            assert len(nodes) == len(other.get_neighbors_within(coord, 2)[0])
+
+    node = tree.add_node(coords[7], tree.root)
+    assert node.index == 201 and len(tree) == 202 - len(removed)
+
+
+def test_check_point_feasible():
+    rng = np.random.default_rng(1)
+    for shape in [(12, 9), (6, 7, 5)]:
+        atlas = rng.choice([MapType.EMPTY, MapType.WALL], size=shape, p=[0.8, 0.2])
+        map_info = MapSpace(atlas)
+        # half-integer coordinations lie on the cell boundary
+        points = rng.integers(0, 2 * np.array(shape) - 2, size=(300, len(shape))) / 2
+        points[::3] += rng.uniform(-0.5, 0.5, size=points[::3].shape)
+        points = np.clip(points, 0, np.array(shape) - 1)
+
+        for point in points:
+            candidates = []
+            for coord in point:
+                floor_coord = np.floor(coord)
+                if coord - floor_coord > 0.5:
+                    candidates.append([floor_coord + 1])
+                elif coord - floor_coord < 0.5:
+                    candidates.append([floor_coord])
+                else:
+                    candidates.append([floor_coord, floor_coord + 1])
+            answer = not any(
+                atlas[tuple(map(int, comb))] == MapType.WALL
+                for comb in combination_from_candidates(candidates)
+            )
+            assert map_info.check_point_feasible(point[np.newaxis]) == answer
+        assert map_info.check_point_feasible(points) == all(
+            map_info.check_point_feasible(point[np.newaxis]) for point in points
+        )
+
+
+def test_voxel_traversal():
+    rng = np.random.default_rng(2)
+    for ndim in [2, 3]:
+        for _ in range(300):
+            # snap some coordinations to the cell boundary or center to produce the corner cases
+            start, end = rng.uniform(-0.5, 5.5, size=(2, ndim))
+            start[rng.random(ndim) < 0.3] = rng.integers(0, 6) - 0.5
+            end[rng.random(ndim) < 0.3] = rng.integers(0, 6)
+            if rng.random() < 0.2:
+                end[0] = start[0]
+
+            cells = set(voxel_traversal(start, end))
+
+            # a cell is touched iff the segment meets its closed box
+            answer = set()
+            delta = end - start
+            for cell in itertools.product(range(-1, 7), repeat=ndim):
+                t_min, t_max = 0.0, 1.0
+                for dim in range(ndim):
+                    low, high = cell[dim] - 0.5, cell[dim] + 0.5
+                    if delta[dim] == 0:
+                        if not low <= start[dim] <= high:
+                            t_min, t_max = 1.0, 0.0
+                        continue
+                    t_low, t_high = sorted(
+                        [(low - start[dim]) / delta[dim], (high - start[dim]) / delta[dim]]
+                    )
+                    t_min, t_max = max(t_min, t_low), min(t_max, t_high)
+                if t_min <= t_max + 1e-9:
+                    answer.add(cell)
+            assert cells == answer
+
+
+def test_traversal_collision_mode():
+    rng = np.random.default_rng(3)
+    atlas = rng.choice([MapType.EMPTY, MapType.WALL], size=(15, 15, 6), p=[0.85, 0.15])
+    sample_map, traversal_map = MapSpace(atlas), MapSpace(atlas, collision_mode="traversal")
+    for _ in range(300):
+        route = rng.uniform(-0.5, 5.5, size=(2, 3)) * [2.5, 2.5, 1]
+        route_info = RouteInfo.from_coords(route)
+        # a sampled point touching a wall means the segment touches it as well
+        if traversal_map.collision_free(route_info):
+            assert sample_map.collision_free(route_info)
+            assert sample_map.collision_free(route_info, fill_num=3000)
+
+
+def test_segments_free():
+    rng = np.random.default_rng(4)
+    atlas = rng.choice([MapType.EMPTY, MapType.WALL], size=(20, 20), p=[0.8, 0.2])
+    starts = rng.uniform(-1, 20, size=(200, 2))
+    ends = starts + rng.uniform(-3, 3, size=(200, 2))
+    for collision_mode in ["sample", "traversal"]:
+        map_info = MapSpace(atlas, collision_mode=collision_mode)
+        answer = [
+            map_info.collision_free(RouteInfo.from_coords(np.array([start, end])))
+            for start, end in zip(starts, ends)
+        ]
+        assert np.all(map_info.segments_free(starts, ends) == answer)
+        assert [
+            map_info.segment_free(start, end) for start, end in zip(starts, ends)
+        ] == answer
+        assert map_info.polyline_free(starts[:3]) == map_info.collision_free(
+            RouteInfo.from_coords(starts[:3])
+        )
+
+
+def test_edge_cache():
+    rng = np.random.default_rng(5)
+    atlas = rng.choice([MapType.EMPTY, MapType.WALL], size=(20, 20), p=[0.8, 0.2])
+    starts = rng.integers(0, 20, size=(100, 2))
+    ends = rng.integers(0, 20, size=(100, 2))
+    map_info = MapSpace(atlas)
+    cached_map_info = MapSpace(atlas, edge_cache=EdgeCache(max_entries=50))
+
+    answer = map_info.segments_free(starts, ends)
+    assert np.all(cached_map_info.segments_free(starts, ends) == answer)
+    assert cached_map_info.edge_cache.misses == 100 and len(cached_map_info.edge_cache) == 50
+
+    # the latest segments are still cached, in either direction
+    assert [
+        cached_map_info.segment_free(end, start) for start, end in zip(starts[50:], ends[50:])
+    ] == list(answer[50:])
+    assert cached_map_info.edge_cache.hits == 50
+    assert cached_map_info.collision_free(
+        RouteInfo.from_coords(np.array([starts[-1], ends[-1], starts[-1]]))
+    ) == answer[-1]
+    assert cached_map_info.edge_cache.hits > 50
+
+    # the results of one map are never served for another
+    with pytest.raises(ValueError):
+        MapSpace(np.zeros((20, 20)), edge_cache=cached_map_info.edge_cache)
+
+    # the byte bound evicts the least recently used entries as the entry bound does
+    max_bytes = 20 * entry_bytes(cached_map_info.edge_cache.key(starts[0], ends[0], 30))
+    edge_cache = EdgeCache(max_bytes=max_bytes)
+    cached_map_info = MapSpace(atlas, edge_cache=edge_cache)
+    assert np.all(cached_map_info.segments_free(starts, ends) == answer)
+    assert len(edge_cache) == 20 and edge_cache.nbytes == max_bytes
+    assert cached_map_info.segment_free(starts[-1], ends[-1]) == answer[-1] and edge_cache.hits == 1
+    edge_cache.clear()
+    assert edge_cache.nbytes == 0
+
+
+def test_compact_map():
+    rng = np.random.default_rng(6)
+    atlas = rng.choice([MapType.EMPTY, MapType.WALL], size=(9, 7, 5), p=[0.7, 0.3]).astype(float)
+    atlas[1, 2, 0], atlas[6, 5, 3] = MapType.ORIGIN, MapType.TARGET
+    grid_map, packed_map = MapSpace(atlas.tolist()), MapSpace(atlas, bit_packed=True)
+    assert grid_map.to_grid().dtype == np.uint8 and np.all(grid_map.to_grid() == atlas)
+    assert packed_map.to_grid().dtype == np.uint8 and np.all(packed_map.to_grid() == atlas)
+    assert np.all(packed_map.wall_mask() == (atlas == MapType.WALL))
+    assert list(packed_map.origin) == [1, 2, 0] and list(packed_map.target) == [6, 5, 3]
+
+    # a nested list is stored as uint8 cells, a uint8 array without copy, and a ragged list is rejected
+    assert MapSpace(atlas.astype(int).tolist())._grid.dtype == np.uint8
+    uint8_atlas = atlas.astype(np.uint8)
+    assert np.shares_memory(MapSpace(uint8_atlas)._grid, uint8_atlas)
+    with pytest.raises(ValueError):
+        MapSpace([[0, 0], [0]])
+    with pytest.raises(ValueError):
+        MapSpace(np.array([[0, 0], [0, None]], dtype=object))
+
+    points = rng.uniform(-0.5, 4.5, size=(500, 3))
+    assert np.all(
+        packed_map.points_touch_wall(points) == grid_map.points_touch_wall(points)
+    )
+
+
+def test_pyramid_collision_mode():
+    rng = np.random.default_rng(7)
+    for shape in [(37, 29), (19, 14, 9)]:
+        # sparse noise plus a few large buildings leave empty, full and mixed blocks
+        atlas = rng.choice([MapType.EMPTY, MapType.WALL], size=shape, p=[0.97, 0.03])
+        for _ in range(3):
+            low = rng.integers(0, np.array(shape) - 4)
+            high = low + rng.integers(2, 9, size=len(shape))
+            atlas[tuple(slice(l, h) for l, h in zip(low, high))] = MapType.WALL
+        traversal_map = MapSpace(atlas, collision_mode="traversal")
+        pyramid_map = MapSpace(atlas, collision_mode="pyramid", bit_packed=True)
+
+        starts = rng.uniform(-0.5, np.array(shape) - 0.5, size=(300, len(shape)))
+        ends = rng.uniform(-0.5, np.array(shape) - 0.5, size=(300, len(shape)))
+        # snap some coordinations to the cell boundary to produce the corner cases
+        starts[::4] = np.round(starts[::4]) - 0.5
+        ends[::5] = np.round(ends[::5])
+        starts, ends = np.clip(starts, -0.5, None), np.clip(ends, -0.5, None)
+
+        answer = traversal_map.segments_free(starts, ends)
+        assert 0 < answer.sum() < answer.shape[0]
+        assert np.all(pyramid_map.segments_free(starts, ends) == answer)
+
+
+def test_free_space_sampler():
+    rng = np.random.default_rng(8)
+    atlas = rng.choice([MapType.EMPTY, MapType.WALL], size=(12, 9, 4), p=[0.6, 0.4])
+    map_info = MapSpace(atlas, bit_packed=True)
+    free_cells = map_info.free_cells()
+    assert map_info.free_cells() is free_cells
+    assert np.all(free_cells == np.flatnonzero(atlas != MapType.WALL))
+
+    for use_integer in [True, False]:
+        sampler = FreeSpaceSampler(free_cells, map_info.shape, use_integer, seed=0)
+        points = sampler.sample_batch(3000)
+        assert not map_info.points_touch_wall(points).any()
+        assert np.all(points == np.round(points)) == use_integer
+        # every free cell is drawn
+        cells = np.ravel_multi_index(tuple(np.round(points).astype(int).T), map_info.shape)
+        assert set(cells) == set(free_cells)
+
+
+def test_neighbor_policy():
+    rng = np.random.default_rng(9)
+    map_info = MapSpace(np.zeros((30, 30)))
+    tree = Tree(np.array([15.0, 15.0]))
+    for coord in rng.uniform(0, 29, size=(999, 2)):
+        tree.add_node(coord, tree.root)
+
+    radius_policy = NeighborPolicy(map_info, "radius")
+    radius = radius_policy.radius(len(tree))
+    assert radius < radius_policy.radius(100) < radius_policy.radius(10)
+    neighbors, dists = radius_policy.query(tree, np.array([10.0, 10.0]))
+    assert np.all(dists <= radius) and len(neighbors) == np.sum(
+        np.linalg.norm(tree.coords - [10, 10], axis=1) <= radius
+    )
+
+    knn_policy = NeighborPolicy(map_info, "knn", k_rrt=2)
+    neighbors, _ = knn_policy.query(tree, np.array([10.0, 10.0]))
+    assert len(neighbors) == np.ceil(2 * np.log(1000))
+
+    # the given node is always one of the neighbors
+    neighbors, dists = NeighborPolicy(map_info, "radius", gamma=0).query(
+        tree, np.array([10.0, 10.0]), tree.root
+    )
+    assert [node.index for node in neighbors] == [0] and np.isclose(dists[0], np.sqrt(50))
+    assert len(NeighborPolicy(map_info, "fixed", 7).query(tree, np.zeros(2))[0]) == 7
+    # the policies never list the free cells of the map
+    assert map_info._free_cells is None and knn_policy.gamma is None
@@ -1,6 +1,8 @@
 import numpy as np
 from loguru import logger
+from RRT.util.arrayhash import array_key
 from RRT.util.comb import combination_from_candidates
+from RRT.util.samplemethod import InformedSampler, Sampler
 
 
 def test_comb():
@@ -29,3 +31,47 @@ def test_comb():
         ]
     )
     assert np.all(answer == np.array(result))
+
+
+def test_array_key():
+    assert array_key(np.array([1, 2])) == array_key(np.array([1.0, 2.0]))
+    assert array_key(np.array([-0.0, 2])) == array_key(np.array([0.0, 2]))
+    assert array_key(np.array([1, 2])) != array_key(np.array([1, 2.01]))
+    assert array_key(np.array([1, 2]), 0.1) == array_key(np.array([1, 2.01]), 0.1)
+
+
+def test_sampler():
+    samplers = [Sampler([-0.5, -0.5], [9.5, 4.5], seed=7, block_size=16) for _ in range(2)]
+    points = np.array([samplers[0].sample() for _ in range(40)])
+    # a batch continues the same sequence across the blocks
+    assert np.all(np.concatenate((samplers[1].sample_batch(3), samplers[1].sample_batch(37))) == points)
+    assert np.all(points == np.round(points))
+    assert np.all((points >= 0) & (points <= [9, 4]))
+    assert [samplers[0].decide(0.3) for _ in range(50)] == [samplers[1].decide(0.3) for _ in range(50)]
+
+    sampler = Sampler([-0.5, 0, 1], [0.5, 1, 2], use_integer=False, seed=7)
+    points = sampler.sample_batch(5000)
+    assert np.all((points >= [-0.5, 0, 1]) & (points <= [0.5, 1, 2]))
+    assert np.allclose(points.mean(axis=0), [0, 0.5, 1.5], atol=0.05)
+
+
+def test_informed_sampler():
+    for origin, target in [([1, 2], [7, 5]), ([0, 3, 1], [5, 1, 4])]:
+        origin, target = np.array(origin), np.array(target)
+        sampler = InformedSampler(origin, target, seed=3)
+        for cost in [sampler.min_cost * 1.01, sampler.min_cost * 2]:
+            points = np.array([sampler.sample(cost) for _ in range(4000)])
+            dists = np.linalg.norm(points - origin, axis=1) + np.linalg.norm(points - target, axis=1)
+            assert np.all(dists <= cost + 1e-9)
+
+            # uniform in the hyperspheroid, so 1 / 2^ndim of the points are in the one with half the radii
+            radii = np.full(len(origin), np.sqrt(cost**2 - sampler.min_cost**2) / 2)
+            radii[0] = cost / 2
+            scaled = (points - (origin + target) / 2) @ sampler.rotation / radii
+            inner = np.mean(np.linalg.norm(scaled, axis=1) <= 0.5)
+            assert abs(inner - 0.5 ** len(origin)) < 0.03
+
+        low, high = np.minimum(origin, target) - 0.5, np.maximum(origin, target) + 0.5
+        sampler = InformedSampler(origin, target, low, high, seed=3)
+        points = np.array([sampler.sample(sampler.min_cost * 3) for _ in range(500)])
+        assert np.all((points >= low) & (points <= high))
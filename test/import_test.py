@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+# the packages only loaded when their features are used
+HEAVY_MODULES = ("scipy", "matplotlib", "pandas", "yacs", "yaml", "nptyping")
+# the import time budgets in microseconds, far above the usual times to stay stable on slow machines
+RRT_BUDGET = 100_000
+TOTAL_BUDGET = 1_000_000
+
+
+def import_time(statement):
+    """run the statement in a new interpreter with -X importtime and get the self import time of each module"""
+    ret = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in ret.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(self_time)
+    return times
+
+
+def test_import_time():
+    for statement in [
+        "from RRT.algorithm.basicRRT import BasicRRT",
+        "from RRT.algorithm.RRT_star import RRT_Star",
+        "from RRT.algorithm.connect_RRT_star import Connect_RRT_Star",
+        "from RRT.algorithm.jps import JPS",
+        "from RRT.algorithm.batch import plan_missions",
+        "from RRT.config import map_loader",
+        "import RRT.util.visualize",
+    ]:
+        times = import_time(statement)
+        assert not [
+            module for module in times if module.split(".")[0] in HEAVY_MODULES
+        ], statement
+        assert sum(t for module, t in times.items() if module.startswith("RRT")) < RRT_BUDGET, statement
+        assert sum(times.values()) < TOTAL_BUDGET, statement
+
+    # the heavy packages are loaded with their features
+    times = import_time(
+        "from RRT.config import get_config; get_config();"
+        "from RRT.util.path_smooth import path_smooth_with_bspline;"
+        "path_smooth_with_bspline([[0, 0], [1, 2], [3, 3]], fill_num=5)"
+    )
+    assert "yacs" in times and "scipy.interpolate" in times
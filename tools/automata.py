@@ -104,6 +104,14 @@ parser.add_argument(
     help="the root dir of output files"
 )
 
+parser.add_argument(
+    "--time-budget",
+    dest="time_budget",
+    default=60,
+    type=float,
+    help="the maximum seconds of each run, the best route found by then is kept",
+)
+
 args = parser.parse_args()
 if len(args.boundary) == 1 or len(args.boundary) > 3:
     parser.error(
@@ -172,7 +180,8 @@ for map_name, alg_name in alg_run_iterator:
         map_name=map_name,
         prob=0.3,
         step_size=3,
-        max_attempts=np.inf
+        max_attempts=np.inf,
+        time_budget=args.time_budget,
     )
     start_time = time.time()
 
@@ -0,0 +1,115 @@
+import argparse
+import json
+import sys
+
+import numpy as np
+from RRT.algorithm.a_star import A_Star
+from RRT.algorithm.basicRRT import BasicRRT
+from RRT.algorithm.batch import plan_missions
+from RRT.algorithm.connect_RRT_star import Connect_RRT_Star
+from RRT.algorithm.jps import JPS
+from RRT.algorithm.RRT_connect import RRT_Connect
+from RRT.algorithm.RRT_star import RRT_Star
+from RRT.algorithm.RRT_with_probability import RRT_With_Probability
+from RRT.config import map_loader
+
+# the planners and whether they take the probability of exploration
+ALGORITHMS = {
+    "basic": (BasicRRT, False),
+    "prob": (RRT_With_Probability, True),
+    "connect": (RRT_Connect, True),
+    "star": (RRT_Star, True),
+    "cstar": (Connect_RRT_Star, True),
+    "astar": (A_Star, False),
+    "jps": (JPS, False),
+}
+
+
+def get_opt():
+    parser = argparse.ArgumentParser(
+        description="""Plan the missions read as JSON Lines, e.g. {"id": 0, "origin": [1, 2], "target": [30, 40]},
+        on one map with a pool of worker processes, and write each result as a JSON line once it is done.
+        """
+    )
+
+    parser.add_argument(
+        "-m", "--map", dest="map", required=True, help="the map name without postfix."
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithm",
+        dest="algorithm",
+        default="star",
+        choices=list(ALGORITHMS.keys()),
+        help="the planner. Default is star",
+    )
+    parser.add_argument(
+        "-p", "--prob", dest="prob", default=0.3, type=float, help="the probability of exploration. Default is 0.3"
+    )
+    parser.add_argument(
+        "-s", "--step-size", dest="step_size", default=3, type=float, help="the size of each step. Default is 3"
+    )
+    parser.add_argument(
+        "--attempt",
+        dest="attempt",
+        default=0,
+        type=int,
+        help="the attempt times. if less than or equal to 0, it will be positive infinity.",
+    )
+    parser.add_argument(
+        "--time-budget",
+        dest="time_budget",
+        default=60,
+        type=float,
+        help="the maximum seconds of each mission, the best route found by then is kept. Default is 60",
+    )
+    parser.add_argument(
+        "-w", "--workers", dest="workers", default=None, type=int, help="the number of worker processes"
+    )
+    parser.add_argument(
+        "-i", "--input", dest="input", default="-", help="the JSON Lines file of missions. Default is stdin"
+    )
+    parser.add_argument(
+        "-o", "--output", dest="output", default="-", help="the JSON Lines file of results. Default is stdout"
+    )
+
+    return parser.parse_args()
+
+
+def read_missions(lines):
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def main():
+    opt = get_opt()
+
+    atlas = np.asarray(map_loader.get_map(opt.map))
+    planner_cls, explore = ALGORITHMS[opt.algorithm]
+    kwargs = {
+        "step_size": opt.step_size,
+        "max_attempts": opt.attempt if opt.attempt > 0 else np.inf,
+        "time_budget": opt.time_budget,
+    }
+    if explore:
+        kwargs["explore_prob"] = opt.prob
+
+    fin = sys.stdin if opt.input == "-" else open(opt.input)
+    fout = sys.stdout if opt.output == "-" else open(opt.output, "w")
+    try:
+        for ret in plan_missions(
+            atlas, read_missions(fin), planner_cls, max_workers=opt.workers, **kwargs
+        ):
+            fout.write(json.dumps(ret) + "\n")
+            fout.flush()
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import time
+
+import numpy as np
+from RRT.algorithm.a_star import A_Star
+from RRT.algorithm.jps import JPS, JumpTable
+from RRT.core.map_space import MapSpace
+from RRT.core.mission_info import MissionInfo
+from RRT.core.sign import Status
+
+from map_generator import generate_2d_map, generate_3d_map
+
+
+def get_opt():
+    parser = argparse.ArgumentParser(
+        "Compare the expansions and wall time of A_Star, JPS and JPS+ on random maps"
+    )
+
+    parser.add_argument(
+        "-t",
+        "--type",
+        dest="type",
+        default="2d",
+        help="the number of dimension",
+        choices=["2d", "3d"],
+    )
+    parser.add_argument(
+        "-b",
+        "--boundary",
+        dest="boundary",
+        nargs="+",
+        default=[200, 200, 20],
+        metavar=[2, 3, 4],
+        help="the integer boundary started from 0 in x, y, z axis",
+    )
+    parser.add_argument(
+        "--block-prob",
+        dest="block_prob",
+        type=float,
+        default=0.2,
+        help="the probability of block generation",
+    )
+    parser.add_argument(
+        "-n",
+        "--num",
+        dest="num",
+        type=int,
+        default=5,
+        help="the number of random maps",
+    )
+    parser.add_argument(
+        "--seed",
+        dest="seed",
+        type=int,
+        default=0,
+        help="the random seed of the maps",
+    )
+
+    args = parser.parse_args()
+    # the generators read these options
+    args.wall = True
+
+    return args
+
+
+def main():
+    opt = get_opt()
+    np.random.seed(opt.seed)
+
+    rows = []
+    for map_id in range(opt.num):
+        atlas = generate_2d_map(opt) if opt.type == "2d" else generate_3d_map(opt)
+        mission_info = MissionInfo(MapSpace(atlas))
+
+        # the tables are built once per map, so they are timed apart from the searches
+        algs = [("A_Star", A_Star(None, mission_info))]
+        for name, jump_distance in [("JPS", False), ("JPS+", True)]:
+            start = time.perf_counter()
+            jump_table = JumpTable(mission_info.map_info, jump_distance)
+            rows.append((map_id, name + " table", "", np.nan, 0, time.perf_counter() - start))
+            algs.append((name, JPS(None, mission_info, jump_table=jump_table)))
+
+        for name, alg in algs:
+            start = time.perf_counter()
+            status = alg.run()
+            elapsed = time.perf_counter() - start
+            length = alg.get_route().get_length() if status == Status.Success else np.nan
+            rows.append((map_id, name, status.name, length, alg.expanded, elapsed))
+
+    print(f"{'map':>4} {'algorithm':>12} {'status':>8} {'length':>10} {'expanded':>9} {'time (s)':>9}")
+    for map_id, name, status, length, expanded, elapsed in rows:
+        print(f"{map_id:>4} {name:>12} {status:>8} {length:>10.3f} {expanded:>9} {elapsed:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import argparse
+
+from RRT.config.map_info_loader import convert_map
+
+
+def get_opt():
+    parser = argparse.ArgumentParser(
+        "Convert yaml map files to binary npy map files, which are memory-mapped when loaded"
+    )
+
+    parser.add_argument(
+        "maps",
+        nargs="+",
+        help="the yaml map files",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="output",
+        default=None,
+        help="the output position of npy file, only for a single map. Default is the yaml file with postfix .npy",
+    )
+
+    args = parser.parse_args()
+    if args.output is not None and len(args.maps) > 1:
+        parser.error("the output can only be given for a single map")
+
+    return args
+
+
+if __name__ == "__main__":
+    opt = get_opt()
+
+    for map_file_name in opt.maps:
+        print(convert_map(map_file_name, opt.output))
@@ -1,3 +1,4 @@
+import os
 import yaml
 import numpy as np
 import argparse
@@ -8,7 +9,7 @@ from RRT.core.sign import MapType
 
 def get_opt():
     parser = argparse.ArgumentParser(
-        "Generate random 2D or 3D map to standard yaml file"
+        "Generate random 2D or 3D map to standard yaml file or binary npy file"
     )
 
     # the dimension setting
@@ -64,7 +65,15 @@ def get_opt():
         dest="output",
         nargs="?",
         default="map.yaml",
-        help="the output position of yaml file",
+        help="the output position of map file, whose postfix follows the format",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        dest="format",
+        default="yaml",
+        choices=["yaml", "npy"],
+        help="the format of map file, npy is memory-mapped when loaded and needs no parse",
     )
 
     args = parser.parse_args()
@@ -142,6 +151,11 @@ def save_yaml(opt: argparse.Namespace, atlas: NDArray[Any]):
         }, f, default_flow_style=None)
 
 
+def save_npy(opt: argparse.Namespace, atlas: NDArray[Any]):
+    output = os.path.splitext(opt.output)[0] + '.npy'
+    np.save(output, np.asarray(atlas, dtype=np.uint8))
+
+
 if __name__ == "__main__":
     opt = get_opt()
 
@@ -151,4 +165,7 @@ if __name__ == "__main__":
         ret = generate_3d_map(opt)
     # [ ] deal with the rest situation
 
-    save_yaml(opt, ret)
+    if opt.format == 'npy':
+        save_npy(opt, ret)
+    else:
+        save_yaml(opt, ret)
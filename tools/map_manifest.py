@@ -0,0 +1,30 @@
+import argparse
+import os
+
+from RRT.config.map_registry import MapRegistry
+
+
+def get_opt():
+    parser = argparse.ArgumentParser(
+        "Index the maps of a directory with their shape, fingerprint and hash into its manifest file"
+    )
+
+    parser.add_argument(
+        "-d",
+        "--dir",
+        dest="dir",
+        default=os.path.join("RRT", "config", "map"),
+        help="the directory of the map files. Default is RRT/config/map",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    opt = get_opt()
+
+    registry = MapRegistry(opt.dir)
+    print(registry.write_manifest())
+    for name in registry.names():
+        entry = registry.manifest[name]
+        print(f"{name:>20} {entry['path']:>24} {str(tuple(entry['shape'])):>16} {entry['hash']}")